@@ -0,0 +1,296 @@
+import json
+import math
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-in for the Shoper REST API, used by the benchmarks.
+# Supports auth, paginated lists with filters and ordering, single record reads and writes,
+# the /bulk endpoint, Shoper's leaky-bucket call limit (X-Shop-Api-* headers and 429 with
+# Retry-After) and 5xx errors injected at a set rate.
+
+ID_FIELDS = {
+    'products': 'product_id',
+    'product-images': 'gfx_id',
+    'categories': 'category_id',
+    'redirects': 'redirect_id',
+    'specialoffers': 'promo_id',
+    'order-products': 'id',
+    'attributes': 'attribute_id',
+    'attribute-groups': 'attribute_group_id',
+    'gauges': 'gauge_id',
+    'metafield-values': 'value_id',
+}
+
+
+def make_catalog(products: int = 5000, seed: int = 0) -> dict:
+    """Generate a deterministic fake catalog."""
+    rng = random.Random(seed)
+    catalog = {name: [] for name in ID_FIELDS}
+
+    for product_id in range(1, products + 1):
+        code = f'SKU{product_id:06d}'
+        catalog['products'].append({
+            'product_id': product_id,
+            'code': code,
+            'ean': f'590{product_id:010d}',
+            'category_id': rng.randint(1, 50),
+            'producer_id': rng.randint(1, 20),
+            'add_date': '2025-01-01 10:00:00',
+            'edit_date': f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00:00',
+            'stock': {'code': code, 'price': round(rng.uniform(10, 300), 2), 'stock': rng.randint(0, 50)},
+            'translations': {'pl_PL': {'name': f'Produkt {product_id}', 'active': 1,
+                                       'description': '<p>Opis produktu</p>' * 5}},
+            'attributes': {},
+        })
+        for _ in range(rng.randint(0, 3)):
+            catalog['product-images'].append({'gfx_id': len(catalog['product-images']) + 1,
+                                              'product_id': product_id, 'order': 1})
+        if product_id % 10 == 0:
+            catalog['specialoffers'].append({'promo_id': product_id // 10, 'product_id': product_id,
+                                             'discount': 10, 'discount_type': 3,
+                                             'date_from': '2025-01-01 00:00:00', 'date_to': '2031-12-31 00:00:00'})
+        if product_id % 7 == 0:
+            catalog['redirects'].append({'redirect_id': product_id // 7, 'type': 0,
+                                         'route': f'/outlet-{code}', 'target': '/outlet'})
+
+    catalog['categories'] = [{'category_id': i, 'root': int(i <= 5), 'translations': {'pl_PL': {'name': f'Kategoria {i}'}}}
+                             for i in range(1, 51)]
+    catalog['attribute-groups'] = [{'attribute_group_id': 550, 'name': 'Informacje'},
+                                   {'attribute_group_id': 577, 'name': 'Outlet'}]
+    catalog['attributes'] = [{'attribute_id': attribute_id, 'attribute_group_id': group_id, 'name': name, 'type': 0}
+                             for attribute_id, group_id, name in ((1160, 550, 'Seria producenta'),
+                                                                  (1370, 550, 'Typ produktu'),
+                                                                  (1686, 550, 'Koszt'),
+                                                                  (1402, 577, 'Uszkodzenie'))]
+    catalog['order-products'] = [{'id': i, 'order_id': i // 3 + 1, 'product_id': rng.randint(1, products), 'quantity': 1}
+                                 for i in range(1, products // 2 + 1)]
+    return catalog
+
+
+def _value(record: dict, path: str):
+    for key in path.split('.'):
+        record = record.get(key) if isinstance(record, dict) else None
+    return record
+
+
+def _matches(record: dict, filters: dict) -> bool:
+    for field, condition in filters.items():
+        value = _value(record, field)
+        if not isinstance(condition, dict):
+            condition = {'=': condition}
+        for operator, argument in condition.items():
+            operator = operator.upper()
+            if operator == 'IN' and value not in argument and str(value) not in map(str, argument):
+                return False
+            if operator in ('=', 'EQ') and str(value) != str(argument):
+                return False
+            if operator == '!=' and str(value) == str(argument):
+                return False
+            if operator in ('>', '>=', '<', '<=') and value is None:
+                return False
+            if operator == '>' and not value > argument:
+                return False
+            if operator == '>=' and not value >= argument:
+                return False
+            if operator == '<' and not value < argument:
+                return False
+            if operator == '<=' and not value <= argument:
+                return False
+            if operator == 'LIKE' and str(argument).strip('%').lower() not in str(value).lower():
+                return False
+    return True
+
+
+class MockShoperServer:
+    def __init__(self, products: int = 5000, latency: float = 0.0, error_rate: float = 0.0,
+                 bucket_limit: int = 10, bucket_rate: float = 50.0, seed: int = 0):
+        """Start with `with MockShoperServer() as server:`, point the client at server.url.
+        Args:
+            products (int): Number of generated products
+            latency (float): Seconds added to every response
+            error_rate (float): Share of requests answered with a random 5xx error
+            bucket_limit (int): Leaky bucket size, X-Shop-Api-Limit
+            bucket_rate (float): Calls per second leaking from the bucket, a full bucket answers 429
+            seed (int): Seed for the catalog and error injection
+        """
+        self.catalog = make_catalog(products, seed)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.bucket_limit = bucket_limit
+        self.bucket_rate = bucket_rate
+        self.bucket = 0.0
+        self.bucket_updated_at = time.monotonic()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server.server_port}'
+
+    def start(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                mock.handle(self, 'GET')
+
+            def do_POST(self):
+                mock.handle(self, 'POST')
+
+            def do_PUT(self):
+                mock.handle(self, 'PUT')
+
+            def do_DELETE(self):
+                mock.handle(self, 'DELETE')
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests = []
+
+    def status_counts(self) -> dict:
+        counts = {}
+        with self.lock:
+            for _, _, status in self.requests:
+                counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def _take_call(self) -> tuple[bool, int]:
+        """Leaky bucket: returns (allowed, calls in bucket)."""
+        with self.lock:
+            now = time.monotonic()
+            self.bucket = max(0.0, self.bucket - (now - self.bucket_updated_at) * self.bucket_rate)
+            self.bucket_updated_at = now
+            if self.bucket + 1 > self.bucket_limit:
+                return False, math.ceil(self.bucket)
+            self.bucket += 1
+            return True, math.ceil(self.bucket)
+
+    def handle(self, handler, method: str):
+        if self.latency:
+            time.sleep(self.latency)
+
+        parsed = urlparse(handler.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = json.loads(handler.rfile.read(length)) if length else None
+        path = parsed.path.removeprefix('/webapi/rest/').strip('/')
+
+        allowed, calls = self._take_call()
+        headers = {'X-Shop-Api-Calls': str(calls), 'X-Shop-Api-Limit': str(self.bucket_limit),
+                   'X-Shop-Api-Bandwidth': f'{calls / self.bucket_limit:.2f}'}
+
+        if not allowed:
+            status, payload = 429, {'error': 'temporarily_unavailable', 'error_description': 'Too many requests'}
+            headers['Retry-After'] = '1'
+        elif path != 'auth' and self.random.random() < self.error_rate:
+            status, payload = self.random.choice([500, 502, 503, 504]), {'error': 'server_error',
+                                                                         'error_description': 'Injected error'}
+        else:
+            status, payload = self.route(method, path, query, body)
+
+        with self.lock:
+            self.requests.append((method, path.split('/')[0], status))
+
+        data = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def category_tree(self) -> list[dict]:
+        """Nested tree of the generated categories: 5 roots, 15 children and 30 grandchildren."""
+        nodes = {category['category_id']: {'id': category['category_id'], 'children': []}
+                 for category in self.catalog['categories']}
+        roots = []
+        for category_id, node in nodes.items():
+            if category_id <= 5:
+                roots.append(node)
+            else:
+                parent_id = (category_id - 6) % 5 + 1 if category_id <= 20 else category_id - 15
+                nodes[parent_id]['children'].append(node)
+        return roots
+
+    def route(self, method: str, path: str, query: dict, body) -> tuple[int, object]:
+        parts = path.split('/')
+
+        if parts == ['auth']:
+            return 200, {'access_token': 'mock-token', 'expires_in': 2592000, 'token_type': 'bearer'}
+
+        if parts == ['bulk']:
+            items = []
+            for sub_request in body or []:
+                sub_path = sub_request['path'].removeprefix('/webapi/rest/').strip('/')
+                code, sub_body = self.route(sub_request['method'], sub_path, sub_request.get('params') or {},
+                                            sub_request.get('body'))
+                items.append({'id': sub_request.get('id'), 'code': code, 'body': sub_body})
+            return 200, {'errors': any(item['code'] != 200 for item in items), 'items': items}
+
+        if parts == ['categories-tree']:
+            return 200, self.category_tree()
+
+        resource = parts[0]
+        if resource not in self.catalog:
+            return 404, {'error': 'not_found', 'error_description': f'Unknown resource {resource}'}
+
+        records = self.catalog[resource]
+        id_field = ID_FIELDS[resource]
+
+        if method == 'GET' and len(parts) == 1:
+            filters = json.loads(query.get('filters', '{}'))
+            selected = [record for record in records if _matches(record, filters)] if filters else records
+            if 'order' in query:
+                field, _, direction = query['order'].partition(' ')
+                selected = sorted(selected, key=lambda record: _value(record, field) or 0,
+                                  reverse=direction.lower() == 'desc')
+            limit = min(int(query.get('limit', 10)), 50)
+            page = int(query.get('page', 1))
+            return 200, {'count': len(selected), 'pages': math.ceil(len(selected) / limit), 'page': page,
+                         'list': selected[(page - 1) * limit:page * limit]}
+
+        if method == 'POST' and len(parts) == 1:
+            with self.lock:
+                new_id = max((record[id_field] for record in records), default=0) + 1
+                records.append({**(body or {}), id_field: new_id})
+            return 200, new_id
+
+        record = next((record for record in records if str(record[id_field]) == parts[1]), None)
+        if record is None:
+            return 404, {'error': 'object_not_found', 'error_description': 'Object not found'}
+
+        if method == 'GET':
+            return 200, record
+        if method == 'PUT':
+            record.update(body or {})
+            return 200, True
+        if method == 'DELETE':
+            with self.lock:
+                records.remove(record)
+            return 200, True
+
+        return 405, {'error': 'method_not_allowed', 'error_description': method}
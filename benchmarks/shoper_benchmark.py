@@ -0,0 +1,275 @@
+"""Offline throughput benchmarks of the Shoper connection, run against a local mock server.
+Run from the repository root:
+    python -m benchmarks.shoper_benchmark
+    python -m benchmarks.shoper_benchmark --products 20000 --latency 0.02 --save logging/bench.json
+    python -m benchmarks.shoper_benchmark --baseline logging/bench.json --max-regression 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# config reads these on import, the benchmark never needs real values
+for variable in ('OUTLET_MAIL_RECIPIENTS', 'PROMO_MAIL_RECIPIENTS'):
+    os.environ.setdefault(variable, '')
+
+import config
+
+# Keep the product index, HTTP cache and cursors of benchmark runs away from real data
+config.DATA_DIR = Path(tempfile.mkdtemp(prefix='shoper_benchmark_'))
+config.EXPORTS_DIR = config.DATA_DIR / 'exports'
+
+from benchmarks.mock_shoper_server import MockShoperServer
+from connections.shoper import (ShoperAPIClient, ShoperRateLimiter, ShoperHTTPCache, ShoperProducts,
+                                ShoperPictures, ShoperSpecialOffers, ShoperRedirects, ShoperCategories,
+                                ShoperAttributes)
+from connections.shoper.aio import ShoperAsyncClient, ShoperAsyncSpecialOffers
+from managers.description_rewriter import DescriptionRewriter
+from utils.helpers.metrics import request_metrics
+
+
+def _quantile(values: list, q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Benchmark:
+    def __init__(self, args):
+        self.args = args
+        self.server = MockShoperServer(products=args.products, latency=args.latency,
+                                       bucket_limit=args.bucket_limit, bucket_rate=args.rate).start()
+        config.SHOPER_SITE_URL = self.server.url
+        # The mock accepts any credentials, the async client only needs them to be set
+        config.SHOPER_LOGIN = config.SHOPER_LOGIN or 'benchmark'
+        config.SHOPER_PASSWORD = config.SHOPER_PASSWORD or 'benchmark'
+        self.latencies = []
+        self.client = self.new_client()
+
+    def new_client(self) -> ShoperAPIClient:
+        limiter = ShoperRateLimiter(rate=self.args.rate, capacity=self.args.bucket_limit)
+        cache = ShoperHTTPCache(config.DATA_DIR / 'cache')
+        client = ShoperAPIClient(rate_limiter=limiter, cache=cache)
+        client.session.hooks['response'].append(
+            lambda response, *args, **kwargs: self.latencies.append(response.elapsed.total_seconds()))
+        client.connect()
+        return client
+
+    def scenarios(self) -> dict:
+        products = ShoperProducts(self.client)
+        pictures = ShoperPictures(self.client)
+        codes = [product['code'] for product in self.server.catalog['products'][::max(1, self.args.products // 500)]]
+        product_ids = [product['product_id'] for product in self.server.catalog['products']]
+        writes = product_ids[:self.args.writes]
+
+        def update_one_by_one():
+            for product_id in writes:
+                products.update_product_by_code(product_id, stock={'price': 10})
+            return len(writes)
+
+        def update_in_bulk():
+            with self.client.bulk() as bulk:
+                for product_id in writes:
+                    products.update_product_by_code(product_id, stock={'price': 10}, bulk=bulk)
+            return len(writes)
+
+        def bulk_write_then_read():
+            # The read must see the bulk write, not the attribute groups cached before it
+            attributes = ShoperAttributes(self.client)
+            attributes.get_all_attribute_groups()
+            categories = [int(time.time() * 1000) % 1000, 1]
+            with self.client.bulk() as bulk:
+                attributes.update_attribute_group_categories(550, categories, bulk=bulk)
+            groups = {group['attribute_group_id']: group for group in attributes.get_all_attribute_groups()}
+            if groups[550].get('categories') != categories:
+                raise RuntimeError(f'Stale cached read after a bulk write: {groups[550].get("categories")}')
+            return len(groups)
+
+        def reconcile_future_offer_twice():
+            # A promo scheduled for the future keeps its date_from, so the second run makes no writes
+            special_offers = ShoperSpecialOffers(self.client)
+            discounts = [{'product_id': product_ids[2], 'discount': 15, 'discount_type': 3,
+                          'date_from': '2030-01-01', 'date_to': '2030-12-31'}]
+            special_offers.reconcile_special_offers(discounts, workers=4)
+            plan = special_offers.reconcile_special_offers(discounts, workers=4)
+            if plan['create'] or plan['update'] or plan['delete']:
+                raise RuntimeError(f'Second reconcile of unchanged discounts made writes: {plan}')
+            return plan['unchanged']
+
+        async def remove_offer_of_unknown_sku_async():
+            # An unknown SKU is reported with an error dict, no request for /products/None is sent
+            async with ShoperAsyncClient() as client:
+                result = await ShoperAsyncSpecialOffers(client).remove_special_offer_from_product(
+                    'UNKNOWN-SKU', use_code=True)
+            if result != {'success': False, 'error': 'Product UNKNOWN-SKU doesn\'t exist'}:
+                raise RuntimeError(f'Unexpected result for an unknown SKU: {result}')
+            return 1
+
+        def rewrite_two_placeholder_snippet():
+            # Every description of the catalog goes through a snippet holding [SKU_OUTLET_CODE] twice
+            rewriter = DescriptionRewriter({'<p>Outlet [SKU_OUTLET_CODE], oryginał: [SKU_OUTLET_CODE]</p>':
+                                            '<p>Oryginał: [SKU_OUTLET_CODE]</p>'})
+            sample, count = rewriter.rewrite('<p>Outlet AB1, oryginał: AB1</p><p>Outlet AB1, oryginał: CD2</p>')
+            if (sample, count) != ('<p>Oryginał: AB1</p><p>Outlet AB1, oryginał: CD2</p>', 1):
+                raise RuntimeError(f'Unexpected rewrite of a two-placeholder snippet: {sample!r}, {count}')
+            rewriter.plan(self.server.catalog['products'])
+            return len(self.server.catalog['products'])
+
+        return {
+            'get_all_products': (lambda: len(products.get_all_products()), {}),
+            'get_all_products_workers': (
+                lambda: len(products.get_all_products(workers=config.SHOPER_MAX_WORKERS)), {}),
+            'get_products_by_codes': (lambda: len(products.get_products_by_codes(codes)['products']), {}),
+            'get_product_by_code_x50': (
+                lambda: sum(1 for code in codes[:50] if 'product_id' in products.get_product_by_code(code, use_code=True)), {}),
+            'get_pictures_for_products': (
+                lambda: sum(map(len, pictures.get_pictures_for_products(product_ids).values())), {}),
+            'get_all_special_offers': (
+                lambda: len(ShoperSpecialOffers(self.client).get_all_special_offers(export=False, workers=4)), {}),
+            'get_all_redirects': (lambda: len(ShoperRedirects(self.client).get_all_redirects(export=False, workers=4)), {}),
+            'get_all_categories_cached': (lambda: len(ShoperCategories(self.client).get_all_categories(export=False)), {}),
+            'update_product_one_by_one': (update_one_by_one, {}),
+            'update_product_bulk': (update_in_bulk, {}),
+            'bulk_write_then_read': (bulk_write_then_read, {}),
+            'reconcile_future_offer_twice': (reconcile_future_offer_twice, {}),
+            'rewrite_two_placeholder_snippet': (rewrite_two_placeholder_snippet, {}),
+            'remove_offer_of_unknown_sku_async': (lambda: asyncio.run(remove_offer_of_unknown_sku_async()), {}),
+            'get_all_products_5xx': (lambda: len(products.get_all_products(workers=config.SHOPER_MAX_WORKERS)),
+                                     {'error_rate': self.args.error_rate}),
+            'get_all_products_throttled': (
+                lambda: len(products.get_all_products(workers=config.SHOPER_MAX_WORKERS)),
+                {'bucket_limit': 3, 'bucket_rate': max(1.0, self.args.rate / 5), 'client_unaware': True}),
+        }
+
+    def run_scenario(self, name: str, func, overrides: dict) -> dict:
+        saved = {key: getattr(self.server, key) for key in ('error_rate', 'bucket_limit', 'bucket_rate')}
+        client_unaware = overrides.pop('client_unaware', False)
+        for key, value in overrides.items():
+            setattr(self.server, key, value)
+
+        # A limiter that trusts its own settings over the server's headers exercises the 429/Retry-After path
+        limiter = self.client.rate_limiter
+        if client_unaware:
+            self.client.rate_limiter = ShoperRateLimiter(rate=self.args.rate, capacity=self.args.bucket_limit)
+            self.client.rate_limiter.update_from_headers = lambda headers: None
+
+        self.server.reset_stats()
+        request_metrics.reset()
+        self.latencies = []
+        start = time.perf_counter()
+        try:
+            records = func()
+            error = None
+        except Exception as e:
+            records, error = 0, str(e)
+        seconds = time.perf_counter() - start
+
+        self.client.rate_limiter = limiter
+        for key, value in saved.items():
+            setattr(self.server, key, value)
+
+        statuses = self.server.status_counts()
+        summary = request_metrics.summary()['endpoints']
+        return {
+            'scenario': name,
+            'records': records,
+            'seconds': round(seconds, 3),
+            'records_per_sec': round(records / seconds, 1) if seconds else None,
+            'requests': sum(statuses.values()),
+            'throttled': statuses.get(429, 0),
+            'server_errors': sum(count for status, count in statuses.items() if status >= 500),
+            'retries': sum(endpoint['retries'] for endpoint in summary),
+            'sleep': round(sum(endpoint['sleep'] for endpoint in summary), 3),
+            'p50_ms': round(_quantile(self.latencies, 0.5) * 1000, 2) if self.latencies else None,
+            'p99_ms': round(_quantile(self.latencies, 0.99) * 1000, 2) if self.latencies else None,
+            'error': error,
+        }
+
+    def run(self) -> list[dict]:
+        results = []
+        scenarios = self.scenarios()
+        selected = self.args.scenarios or list(scenarios)
+
+        for name in selected:
+            func, overrides = scenarios[name]
+            runs = [self.run_scenario(name, func, dict(overrides)) for _ in range(self.args.repeat)]
+            result = min(runs, key=lambda run: run['seconds'])
+            result['seconds_median'] = round(statistics.median(run['seconds'] for run in runs), 3)
+            results.append(result)
+
+        self.server.stop()
+        return results
+
+
+def print_results(results: list[dict]):
+    columns = ['scenario', 'records', 'seconds', 'records_per_sec', 'requests', 'throttled',
+               'server_errors', 'retries', 'sleep', 'p50_ms', 'p99_ms']
+    widths = {column: max(len(column), *(len(str(result[column])) for result in results)) for column in columns}
+
+    print(' | '.join(column.ljust(widths[column]) for column in columns))
+    print('-+-'.join('-' * widths[column] for column in columns))
+    for result in results:
+        print(' | '.join(str(result[column]).ljust(widths[column]) for column in columns))
+        if result['error']:
+            print(f'  ❌ {result["error"]}')
+
+
+def compare_with_baseline(results: list[dict], baseline_path: str, max_regression: float) -> list[str]:
+    """List scenarios whose records/sec dropped more than max_regression against a saved run."""
+    with open(baseline_path, 'r', encoding='utf-8') as file:
+        baseline = {result['scenario']: result for result in json.load(file)['results']}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result['scenario'])
+        if not previous or not previous.get('records_per_sec') or result['records_per_sec'] is None:
+            continue
+        change = result['records_per_sec'] / previous['records_per_sec'] - 1
+        if change < -max_regression:
+            regressions.append(f'{result["scenario"]}: {previous["records_per_sec"]} -> '
+                               f'{result["records_per_sec"]} records/sec ({change:+.0%})')
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=5000, help='Products in the mock catalog')
+    parser.add_argument('--latency', type=float, default=0.01, help='Seconds added to every mock response')
+    parser.add_argument('--rate', type=float, default=100.0, help='Calls per second the mock bucket drains at')
+    parser.add_argument('--bucket-limit', type=int, default=10, help='Mock X-Shop-Api-Limit')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Share of 5xx answers in the *_5xx scenario')
+    parser.add_argument('--writes', type=int, default=200, help='Product updates in the write scenarios')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per scenario, the fastest one is reported')
+    parser.add_argument('--scenarios', nargs='*', help='Scenarios to run, all by default')
+    parser.add_argument('--save', help='Save results as JSON')
+    parser.add_argument('--baseline', help='Compare against results saved with --save')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='Allowed records/sec drop vs baseline')
+    args = parser.parse_args(argv)
+
+    results = Benchmark(args).run()
+    print_results(results)
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as file:
+            json.dump({'args': vars(args), 'results': results}, file, indent=4)
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.max_regression)
+        for regression in regressions:
+            print(f'❌ Regression: {regression}')
+        if regressions:
+            return 1
+        print('✅ No regressions against the baseline')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,6 +11,7 @@ DATA_DIR = ROOT_DIR / 'data'
 MANAGERS_DIR = ROOT_DIR / 'managers'
 EXPORTS_DIR = ROOT_DIR / 'exports'
 LOGGING_DIR = ROOT_DIR / 'logging'
+EXPORT_COMPRESSION = 'gzip' # None, 'gzip' or 'zstd' (needs zstandard) for NDJSON exports
 
 # DRIVE_EXPORT_DIR = r'W:\Pansernik\Eksporty' if os.path.exists('H:') else None
 
@@ -23,6 +24,24 @@ SHOPER_SITE_URL = os.getenv(f'SHOPER_SITE_URL_{SHOPER_SITE}')
 SHOPER_LOGIN = os.getenv(f'SHOPER_LOGIN_{SHOPER_SITE}')
 SHOPER_PASSWORD = os.getenv(f'SHOPER_PASSWORD_{SHOPER_SITE}')
 SHOPER_LIMIT = 50
+SHOPER_MAX_WORKERS = 4 # Concurrent page downloads
+SHOPER_MAX_IN_FLIGHT = 8 # Concurrent requests of the asyncio client
+SHOPER_REQUESTS_PER_SECOND = 2 # Shoper's bucket drain rate, shared by all threads using one client
+SHOPER_BUCKET_LIMIT = 10 # Updated from X-Shop-Api-Limit on every response
+SHOPER_BUCKET_HEADROOM = 1 # Calls kept free in the bucket to avoid 429s
+SHOPER_PRODUCT_INDEX_TTL = 7 * 24 * 3600 # Seconds a SKU/EAN -> product_id mapping is trusted
+SHOPER_BULK_LIMIT = 25 # Max sub-requests in one /bulk call
+SHOPER_MAX_FILTER_LENGTH = 1500 # Max url-encoded length of an IN filter, keeps urls under server limits
+SHOPER_CACHE_TTLS = { # Seconds a cached GET response stays fresh, only these resources are cached
+    'categories': 6 * 3600,
+    'categories-tree': 6 * 3600,
+    'gauges': 24 * 3600,
+    'attributes': 6 * 3600,
+    'attribute-groups': 6 * 3600,
+    'metafields': 24 * 3600,
+}
+SHOPER_CACHE_MAX_BYTES = 200 * 1024 * 1024
+SHOPER_CATEGORY_TREE_TTL = 6 * 3600 # Seconds the saved category tree is reused before it's rebuilt
 
 SHOPIFY_CREDENTIALS = {
     'api_key': os.getenv('SHOPIFY_API_KEY'),
@@ -42,6 +61,9 @@ ALLEGRO_API_SECRET = os.getenv(f'ALLEGRO_API_SECRET_{ALLEGRO_SITE}')
 ALLEGRO_CLIENT_ID = os.getenv(f'ALLEGRO_CLIENT_ID_{ALLEGRO_SITE}')
 ALLEGRO_API_URL = os.getenv(f'ALLEGRO_API_URL_{ALLEGRO_SITE}')
 ALLEGRO_API_VERSION = 'application/vnd.allegro.public.v1+json'
+ALLEGRO_OFFERS_LIMIT = 1000 # Max offers per /sale/offers page
+ALLEGRO_MAX_WORKERS = 4 # Concurrent page downloads
+ALLEGRO_REQUESTS_PER_SECOND = 25 # Kept well under Allegro's 9000 requests per minute per client
 
 EBAY_CLIENT_ID = os.getenv('EBAY_CLIENT_ID')
 EBAY_CLIENT_SECRET = os.getenv('EBAY_CLIENT_SECRET')
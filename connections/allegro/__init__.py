@@ -1,2 +1,4 @@
 from .client import AllegroAPIClient
-from .offers import AllegroOffers
\ No newline at end of file
+from .offers import AllegroOffers
+
+from .exceptions import AllegroAPIError
@@ -5,6 +5,8 @@ import json
 import os
 from datetime import datetime, timedelta, timezone
 import config
+from utils.helpers.rate_limiter import TokenBucketRateLimiter
+from utils.helpers.metrics import request_metrics
 
 
 class AllegroAPIClient:
@@ -16,7 +18,10 @@ class AllegroAPIClient:
         )
         self.token = self.token_manager.get_access_token()
         self.session = requests.Session()
+        self.session.hooks['response'].append(request_metrics.response_hook('allegro'))
         self.site = config.ALLEGRO_SITE
+        self.rate_limiter = TokenBucketRateLimiter(rate=config.ALLEGRO_REQUESTS_PER_SECOND,
+                                                   capacity=config.ALLEGRO_REQUESTS_PER_SECOND)
 
     def connect(self):
         self.session.headers.update({
@@ -24,6 +29,30 @@ class AllegroAPIClient:
             'Accept': config.ALLEGRO_API_VERSION
         })
 
+    def request(self, method, url, max_retries=5, backoff_factor=1.5, **kwargs):
+        """Send a rate limited request, retrying on 429 and 5xx errors.
+        Returns the last response, callers check its status code."""
+        for attempt in range(max_retries):
+            waited = self.rate_limiter.acquire()
+            request_metrics.record_sleep('allegro', method, url, waited)
+            response = self.session.request(method, url, **kwargs)
+
+            if response.status_code == 429:
+                retry_after = int(response.headers.get('Retry-After', 1))
+                self.rate_limiter.penalize(retry_after)
+                request_metrics.record_retry('allegro', method, url, 429, retry_after)
+                continue
+
+            if response.status_code in {500, 502, 503, 504}:
+                wait = backoff_factor ** attempt
+                request_metrics.record_retry('allegro', method, url, response.status_code, wait)
+                time.sleep(wait)
+                continue
+
+            return response
+
+        return response
+
 
 class AllegroTokenManager:
     def __init__(self, client_id, client_secret, api_url, token_file=f'{config.ROOT_DIR}/credentials/allegro_{config.ALLEGRO_SITE.lower()}_token.json'):
@@ -0,0 +1,18 @@
+class AllegroAPIError(Exception):
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.url = response.url
+
+        try:
+            self.error_data = response.json()
+        except Exception:
+            self.error_data = {}
+
+        errors = self.error_data.get('errors')
+        if isinstance(errors, list) and errors:
+            self.message = errors[0].get('userMessage') or errors[0].get('message', 'Unknown error')
+        else:
+            self.message = self.error_data.get('error_description', response.text)
+
+        # Final exception message
+        super().__init__(f"[{self.status_code}] {self.message} ({self.url})")
@@ -1,6 +1,9 @@
 import config
-import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
+from .exceptions import AllegroAPIError
+from utils.helpers.helper_functions import export_to_ndjson
 
 
 class AllegroOffers:
@@ -57,54 +60,184 @@ class AllegroOffers:
         
         return response.json()
 
-    def get_all_offers(self):
-        """Get all offers from Allegro API.
-        Returns:
-            list: A list of all offers if successful, or an Error Dict if failed.
-
-        https://developer.allegro.pl/documentation#tag/User's-offer-information/operation/searchOffersUsingGET
-        """
+    def _get_offers_page(self, params: dict, offset: int) -> dict:
         url = f'{config.ALLEGRO_API_URL}/sale/offers'
-        all_offers = []
+        response = self.client.request('GET', url, params={**params, 'offset': offset})
 
-        params = {'limit': 100, 'offset': 0}
+        if response.status_code != 200:
+            raise AllegroAPIError(response)
 
-        response = self.client.session.request('GET', url, params=params)
-        response_json = response.json()
+        return response.json()
 
-        if response.status_code != 200:
-            if 'errors' in response_json and isinstance(response_json['errors'], list):
-                error_message = response_json['errors'][0].get('message', 'Unknown error')
-            else:
-                error_message = response_json.get('error_description', 'Unknown error')
+    def iter_offers(self, params: dict | None = None, workers: int = config.ALLEGRO_MAX_WORKERS,
+                    limit: int = config.ALLEGRO_OFFERS_LIMIT):
+        """Stream offers from Allegro page by page.
+        The first page gives totalCount and is yielded right away, the remaining offsets are
+        downloaded by a bounded thread pool sharing the client's rate limit. Offers are yielded
+        in offset order and only the pages being downloaded are kept in memory.
+        Args:
+            params (dict): Query parameters of /sale/offers, e.g. filters
+            workers (int): Number of pages downloaded at the same time
+            limit (int): Offers per page, Allegro allows up to 1000
+        Yields:
+            dict: Offer data
+        Raises:
+            AllegroAPIError: If any page fails, queued pages are cancelled
 
-            return {'success': False, 'error': error_message}
-        
-        total_products = response_json.get('totalCount', 0)
+        https://developer.allegro.pl/documentation#tag/User's-offer-information/operation/searchOffersUsingGET
+        """
+        params = {**(params or {}), 'limit': limit}
+        workers = max(workers, 1)
+
+        data = self._get_offers_page(params, 0)
+        total = data.get('totalCount', 0)
+        yield from data.get('offers', [])
+
+        offsets = iter(range(limit, total, limit))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        window = deque(executor.submit(self._get_offers_page, params, offset) for _, offset in zip(range(workers), offsets))
+
+        try:
+            with tqdm(total=total, initial=len(data.get('offers', [])), desc="Downloading offers", unit=" offer") as progress:
+                while window:
+                    offers = window.popleft().result().get('offers', [])
+                    progress.update(len(offers))
+
+                    next_offset = next(offsets, None)
+                    if next_offset is not None:
+                        window.append(executor.submit(self._get_offers_page, params, next_offset))
+
+                    yield from offers
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _offer_filters(status: str | list[str] | None = None, external_ids: list[str] | None = None,
+                       name: str | None = None, price_from: float | None = None, price_to: float | None = None,
+                       category_id: str | None = None) -> dict:
+        """Turn filter arguments into /sale/offers query parameters, list values are sent as repeated parameters."""
+        params = {}
+        if status:
+            params['publication.status'] = [status] if isinstance(status, str) else list(status)
+        if external_ids:
+            params['external.id'] = list(external_ids)
+        if name:
+            params['name'] = name
+        if price_from is not None:
+            params['sellingMode.price.amount.gte'] = price_from
+        if price_to is not None:
+            params['sellingMode.price.amount.lte'] = price_to
+        if category_id:
+            params['category.id'] = category_id
+        return params
+
+    def iter_filtered_offers(self, status: str | list[str] | None = None, external_ids: list[str] | None = None,
+                             name: str | None = None, price_from: float | None = None, price_to: float | None = None,
+                             category_id: str | None = None, workers: int = config.ALLEGRO_MAX_WORKERS):
+        """Stream only the offers matching the filters, Allegro filters them server-side.
+        Args:
+            status (str|list): Publication status: ACTIVE, INACTIVE, ACTIVATING or ENDED
+            external_ids (list): External IDs (SKU) of the offers
+            name (str): Phrase the offer title has to contain
+            price_from (float): Minimal price
+            price_to (float): Maximal price
+            category_id (str): Allegro category ID
+            workers (int): Number of pages downloaded at the same time
+        Yields:
+            dict: Offer data
+        """
+        params = self._offer_filters(status, external_ids, name, price_from, price_to, category_id)
+        yield from self.iter_offers(params, workers=workers)
 
-        for offset in tqdm(range(0, total_products, 100),
-                        desc="Downloading offers", unit=" product"):
-            
-            params['offset'] = offset
-            response = self.client.session.request('GET', url, params=params)
-            response_json = response.json()
+    def get_offers(self, **filters) -> list[dict] | dict:
+        """Get offers matching the filters, see iter_filtered_offers for the arguments.
+        Returns:
+            list: A list of matching offers if successful, or an Error Dict if failed.
+        """
+        try:
+            return list(self.iter_filtered_offers(**filters))
+        except AllegroAPIError as e:
+            return {'success': False, 'error': e.message}
+
+    def get_active_offers(self, workers: int = config.ALLEGRO_MAX_WORKERS) -> list[dict] | dict:
+        """Get offers with publication status ACTIVE."""
+        print("ℹ️  Downloading active offers...")
+        return self.get_offers(status='ACTIVE', workers=workers)
+
+    def paginate_in(self, field: str, values: list, chunk_size: int = 100,
+                    workers: int = config.ALLEGRO_MAX_WORKERS, **filters) -> list[dict]:
+        """Download offers whose `field` is one of `values`, the Allegro counterpart of Shoper's paginate_in.
+        Values are sent in chunks of repeated query parameters and the chunks are paginated concurrently.
+        Args:
+            field (str): List filter of iter_filtered_offers, e.g. 'external_ids'
+            values (list): Values to look up
+            chunk_size (int): Values per request, keeps urls short
+            workers (int): Number of chunks downloaded at the same time
+            filters: Other iter_filtered_offers filters applied to every chunk
+        Returns:
+            list: Offers of every chunk, in chunk order
+        """
+        chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
 
-            if response.status_code != 200:
-                if 'errors' in response_json and isinstance(response_json['errors'], list):
-                    error_message = response_json['errors'][0].get('message', 'Unknown error')
-                else:
-                    error_message = response_json.get('error_description', 'Unknown error')
+        def fetch_chunk(chunk):
+            return list(self.iter_filtered_offers(**filters, **{field: chunk}, workers=1))
 
-                return {'success': False, 'error': error_message}
-            
-            offers = response_json.get('offers', [])
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            return [offer for chunk in executor.map(fetch_chunk, chunks) for offer in chunk]
 
-            if not offers:
-                break
+    def get_offers_by_external_ids(self, external_ids: list[str], status: str | list[str] | None = None,
+                                   chunk_size: int = 100, workers: int = config.ALLEGRO_MAX_WORKERS) -> dict:
+        """Get offers by their external IDs (SKU), many IDs are sent in one request.
+        Args:
+            external_ids (list): External IDs
+            status (str|list): Optional publication status filter
+            chunk_size (int): External IDs per request, keeps urls short
+            workers (int): Number of chunks downloaded at the same time
+        Returns:
+            dict: {'offers': {external_id: [offers]}, 'missing': [external IDs without an offer]}
+        """
+        external_ids = list(dict.fromkeys(str(external_id) for external_id in external_ids))
 
-            all_offers.extend(offers)
+        offers = {}
+        for offer in self.paginate_in('external_ids', external_ids, chunk_size=chunk_size, workers=workers,
+                                      status=status):
+            offers.setdefault((offer.get('external') or {}).get('id'), []).append(offer)
 
-        with open('allegro.json', 'w', encoding='utf-8') as f:
-            json.dump(all_offers, f, indent=2, ensure_ascii=False)
+        return {
+            'offers': offers,
+            'missing': [external_id for external_id in external_ids if external_id not in offers]
+        }
+
+    def get_all_offers(self, workers: int = config.ALLEGRO_MAX_WORKERS, sink=None) -> list[dict] | dict:
+        """Get all offers from Allegro API.
+        Args:
+            workers (int): Number of pages downloaded at the same time
+            sink: Optional writer with a write(record) method, e.g. NDJSONExportSink, every offer is
+                passed to it as it arrives. The caller opens and closes the sink.
+        Returns:
+            list: A list of all offers if successful, or an Error Dict if failed.
+        """
+        print("ℹ️  Downloading all offers...")
+        all_offers = []
+
+        try:
+            for offer in self.iter_offers(workers=workers):
+                if sink is not None:
+                    sink.write(offer)
+                all_offers.append(offer)
+        except AllegroAPIError as e:
+            return {'success': False, 'error': e.message}
 
         return all_offers
+
+    def export_all_offers(self, workers: int = config.ALLEGRO_MAX_WORKERS,
+                          compression: str | None = config.EXPORT_COMPRESSION):
+        """Stream all offers straight into an NDJSON export, in constant memory.
+        Args:
+            workers (int): Number of pages downloaded at the same time
+            compression (str): None, 'gzip' or 'zstd'
+        Returns:
+            Path: Path of the exported file
+        """
+        print("ℹ️  Exporting all offers...")
+        return export_to_ndjson(self.iter_offers(workers=workers), 'allegro/allegro_offers.ndjson', compression)
@@ -6,6 +6,7 @@ import urllib.parse
 import webbrowser
 import requests
 import config
+from utils.helpers.metrics import request_metrics
 
 # Different APIs use different Authentication methods. 
 # EbayAPIClient is built with RESTful InventoryAPI in mind, 
@@ -23,6 +24,7 @@ class EbayAPIClient:
         self.oauth = None
         self.token = None
         self.session = requests.Session()
+        self.session.hooks['response'].append(request_metrics.response_hook('ebay'))
 
     def connect(self):
         self.oauth = EbayOAuthTokenClient(
@@ -1,6 +1,7 @@
 import gspread
 import time
 import config
+from utils.helpers.metrics import request_metrics
 
 
 class GSheetsClient:
@@ -37,13 +38,14 @@ class GSheetsClient:
         while retry_count < max_retries:
 
             try:
-                return func(*args, **kwargs)
+                return request_metrics.timed('gsheets', 'CALL', func.__name__, func, *args, **kwargs)
             
             except gspread.exceptions.APIError as e:
                 retry_count += 1
 
                 if "RESOURCE_EXHAUSTED" in str(e) or "429" in str(e):
                     delay = base_delay * (2 ** (retry_count - 1))  # Exponential backoff
+                    request_metrics.record_retry('gsheets', 'CALL', func.__name__, 429, delay)
                     # print(f"API quota exceeded. Waiting {delay} seconds before retry {retry_count}/{max_retries}...")
                     time.sleep(delay)
                 else:
@@ -1,4 +1,11 @@
 from .client import ShoperAPIClient
+from .rate_limiter import ShoperRateLimiter
+from .product_index import ShoperProductIndex
+from .cache import ShoperHTTPCache
+from .redirect_index import ShoperRedirectIndex
+from .category_tree import ShoperCategoryTree
+from .attribute_registry import ShoperAttributeRegistry
+from .compatibility_index import ShoperCompatibilityIndex
 from .products import ShoperProducts
 from .attributes import ShoperAttributes
 from .pictures import ShoperPictures
@@ -9,5 +16,8 @@ from .orders_products import ShoperProductOrders
 from .specialoffers import ShoperSpecialOffers
 from .metafields import ShoperMetafields
 from .metafield_values import ShoperMetafieldValues
+from .mirror import ShoperCatalogMirror
+
+from .bulk import ShoperBulk, ShoperBulkItem
 
 from .exceptions import ShoperAPIError
\ No newline at end of file
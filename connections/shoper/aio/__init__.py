@@ -0,0 +1,4 @@
+from .client import ShoperAsyncClient
+from .products import ShoperAsyncProducts
+from .specialoffers import ShoperAsyncSpecialOffers
+from .orders_products import ShoperAsyncProductOrders
@@ -0,0 +1,178 @@
+from ..exceptions import ShoperAPIError
+from ..rate_limiter import ShoperRateLimiter
+from ..pagination import chunk_filter_values
+from ..product_index import ShoperProductIndex
+from collections import deque
+from utils.helpers.metrics import request_metrics
+import aiohttp, asyncio, config, json, time
+
+
+class ShoperAsyncResponse:
+    """Fully read aiohttp response with the interface of requests.Response used by the resources."""
+    def __init__(self, status_code: int, url: str, headers, text: str):
+        self.status_code = status_code
+        self.url = url
+        self.headers = headers
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ShoperAsyncClient:
+    def __init__(self, max_in_flight: int = config.SHOPER_MAX_IN_FLIGHT,
+                 rate_limiter: ShoperRateLimiter | None = None):
+        """Initialize an asyncio Shoper Client
+        All resources share one keep-alive connection pool and at most `max_in_flight`
+        requests are sent at the same time. Usage:
+            async with ShoperAsyncClient() as client:
+                products, orders = await asyncio.gather(
+                    ShoperAsyncProducts(client).get_all_products(),
+                    ShoperAsyncProductOrders(client).get_new_product_orders())
+        Args:
+            max_in_flight (int): Maximum number of requests sent at the same time
+            rate_limiter (ShoperRateLimiter): Limiter shared with other clients of the same shop
+        """
+        self.site_url = config.SHOPER_SITE_URL
+        self.login = config.SHOPER_LOGIN
+        self.password = config.SHOPER_PASSWORD
+        self.max_in_flight = max_in_flight
+        self.rate_limiter = rate_limiter or ShoperRateLimiter()
+        self.session = None
+        self.semaphore = None
+        self.token = None
+        self._product_index = None
+
+    async def _handle_request(self, method, url, max_retries=5, backoff_factor=1.5, **kwargs):
+        """Handle API requests with automatic retry on 429 and 5xx errors."""
+        attempt = 0
+        if 'params' in kwargs:
+            kwargs['params'] = {key: str(value) for key, value in kwargs['params'].items()}
+
+        while attempt < max_retries:
+            async with self.semaphore:
+                wait = self.rate_limiter.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    request_metrics.record_sleep('shoper', method, url, wait)
+
+                start = time.perf_counter()
+                async with self.session.request(method, url, **kwargs) as raw_response:
+                    response = ShoperAsyncResponse(raw_response.status, str(raw_response.url),
+                                                   raw_response.headers, await raw_response.text())
+                request_metrics.record('shoper', method, url, response.status_code,
+                                       time.perf_counter() - start, len(response.text.encode()))
+
+            self.rate_limiter.update_from_headers(response.headers)
+
+            if response.status_code == 429:
+                retry_after = int(response.headers.get('Retry-After', 1))
+                self.rate_limiter.penalize(retry_after)
+                request_metrics.record_retry('shoper', method, url, 429, retry_after)
+                attempt += 1
+                continue
+
+            elif response.status_code in {500, 502, 503, 504}:
+                request_metrics.record_retry('shoper', method, url, response.status_code, backoff_factor ** attempt)
+                await asyncio.sleep(backoff_factor ** attempt)
+                attempt += 1
+                continue
+
+            if response.status_code != 200:
+                raise ShoperAPIError(response)
+
+            return response
+
+        # Every attempt ended with 429 or 5xx, report the last answer instead of returning None
+        raise ShoperAPIError(response)
+
+    async def connect(self):
+        """Open the connection pool and authenticate with the API"""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+            self.session = aiohttp.ClientSession(connector=connector)
+            self.semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        response = await self._handle_request(
+            'POST',
+            f'{self.site_url}/webapi/rest/auth',
+            auth=aiohttp.BasicAuth(self.login, self.password)
+        )
+
+        self.token = response.json().get('access_token')
+        self.session.headers.update({'Authorization': f'Bearer {self.token}'})
+        return {'success': True}
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def product_index(self) -> ShoperProductIndex:
+        """SKU/EAN -> product_id index shared by every resource using this client."""
+        if self._product_index is None:
+            self._product_index = ShoperProductIndex()
+        return self._product_index
+
+    @property
+    def is_connected(self):
+        return self.token is not None
+
+    async def paginate(self, url: str, params: dict | None = None, filters: dict | None = None,
+                       start_page: int = 1, end_page: int | None = None, max_records: int | None = None):
+        """Async counterpart of pagination.paginate.
+        The next pages are requested concurrently (bounded by max_in_flight) and records
+        are yielded in page order.
+        Yields:
+            dict: Records in page order
+        """
+        params = {'limit': config.SHOPER_LIMIT, **(params or {})}
+        if filters:
+            params['filters'] = json.dumps(filters)
+
+        async def fetch_page(page):
+            response = await self._handle_request('GET', url, params={**params, 'page': page})
+            return response.json().get('list', [])
+
+        first = (await self._handle_request('GET', url, params={**params, 'page': start_page})).json()
+        last_page = first.get('pages', 1) if end_page is None else min(end_page, first.get('pages', 1))
+        pages = iter(range(start_page + 1, last_page + 1))
+        window = deque(asyncio.create_task(fetch_page(page)) for _, page in zip(range(self.max_in_flight), pages))
+        remaining = max_records
+
+        try:
+            records = first.get('list', [])
+            while True:
+                for record in records:
+                    if remaining == 0:
+                        return
+                    if remaining is not None:
+                        remaining -= 1
+                    yield record
+
+                if not window:
+                    return
+
+                records = await window.popleft()
+                next_page = next(pages, None)
+                if next_page is not None:
+                    window.append(asyncio.create_task(fetch_page(next_page)))
+        finally:
+            for task in window:
+                task.cancel()
+
+    async def filter_in(self, url: str, field: str, values: list) -> list[dict]:
+        """Download records whose `field` is one of `values`, chunked into IN filters run concurrently."""
+        async def fetch_chunk(chunk):
+            return [record async for record in self.paginate(url, filters={field: {'IN': chunk}})]
+
+        chunks = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunk_filter_values(field, values)))
+        return [record for chunk in chunks for record in chunk]
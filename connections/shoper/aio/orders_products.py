@@ -0,0 +1,59 @@
+from ..orders_products import ShoperProductOrders
+import asyncio, config
+
+
+class ShoperAsyncProductOrders(ShoperProductOrders):
+    """asyncio counterpart of ShoperProductOrders, sharing its persisted cursor.
+    https://developers.shoper.pl/developers/api/resources/order-products
+    """
+
+    async def get_latest_product_orders(self, pages_to_fetch=1):
+        """Get latest product orders from Shoper, see ShoperProductOrders.get_latest_product_orders
+        The last pages are requested concurrently and returned in the same order as the sync method:
+        the last page first, rows of every page in the API's default (ascending ID) order.
+        Args:
+            pages_to_fetch (int): Number of pages to fetch, default is 1.
+        Returns:
+            list|dict: Data list if successful, Error dict if failed
+        """
+        params = {'limit': config.SHOPER_LIMIT}
+
+        print("ℹ️  Downloading latest product orders...")
+        data = (await self.client._handle_request('GET', self.url, params={**params, 'page': 1})).json()
+        number_of_pages = data['pages']
+
+        if pages_to_fetch > number_of_pages:
+            return {'success': False, 'error': 'Requested number of pages exceeds available data.'}
+
+        async def fetch_page(page):
+            response = await self.client._handle_request('GET', self.url, params={**params, 'page': page})
+            return response.json().get('list', [])
+
+        pages = await asyncio.gather(*(fetch_page(page) for page in
+                                       range(number_of_pages, number_of_pages - pages_to_fetch, -1)))
+        return [order_product for page in pages for order_product in page]
+
+    async def get_new_product_orders(self, save_cursor: bool = True) -> list[dict]:
+        """Get product orders added since the previous call, see ShoperProductOrders.get_new_product_orders
+        Args:
+            save_cursor (bool): Advance the cursor right away, pass False and call commit_cursor after the sync
+        Returns:
+            list: New order products, ordered by ID
+        """
+        last_id = self.get_last_seen_id()
+
+        if last_id is None:
+            print("ℹ️  No order-products cursor yet, downloading the newest page...")
+            order_products = [order_product async for order_product in
+                              self.client.paginate(self.url, params={'order': 'id desc'}, end_page=1)]
+            order_products.reverse()
+        else:
+            print(f"ℹ️  Downloading product orders newer than {last_id}...")
+            order_products = [order_product async for order_product in
+                              self.client.paginate(self.url, params={'order': 'id asc'},
+                                                   filters={'id': {'>': last_id}})]
+
+        if save_cursor:
+            self.commit_cursor(order_products)
+
+        return order_products
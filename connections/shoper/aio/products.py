@@ -0,0 +1,190 @@
+from ..exceptions import ShoperAPIError
+from ..products import normalize_code
+import asyncio, json
+
+
+class ShoperAsyncProducts:
+    def __init__(self, client):
+        """Initialize an asyncio Shoper Client, see ShoperProducts
+        https://developers.shoper.pl/developers/api/resources/products
+        """
+        self.client = client
+        self.url = f'{self.client.site_url}/webapi/rest/products'
+        self.url_pictures = f'{self.client.site_url}/webapi/rest/product-images'
+
+    async def get_product_by_code(self, identifier: str, pictures: bool = False, use_code: bool = False) -> dict:
+        """Get a product from Shoper by either product ID or product code.
+        Args:
+            identifier (str): Product ID (int) or product code (str)
+            use_code (bool): If True, use product code (SKU) instead of ID
+        Returns:
+            dict: Product data if successful, Error dict if failed
+        """
+        if use_code:
+            response = await self.client._handle_request(
+                'GET',
+                self.url,
+                params={'filters': json.dumps({'stock.code': identifier})}
+            )
+            product_list = response.json().get('list', [])
+
+            if not product_list:
+                return {'success': False,
+                        'error': f'Product {identifier} doesn\'t exist'}
+
+            product = product_list[0]
+            self.client.product_index.add(product)
+        else:
+            response = await self.client._handle_request('GET', f'{self.url}/{identifier}')
+            product = response.json()
+
+        if pictures:
+            product['img'] = [image async for image in self.client.paginate(
+                self.url_pictures, filters={'product_id': product['product_id']})]
+
+        return product
+
+    async def get_products_by_codes(self, codes: list[str]) -> dict:
+        """Get many products by product code (SKU), see ShoperProducts.get_products_by_codes
+        Returns:
+            dict: {'products': {requested code: product}, 'missing': [requested codes not found]}
+        """
+        codes = list(dict.fromkeys(str(code) for code in codes))
+        lookup = list(dict.fromkeys(code.strip() for code in codes))
+        found = {}
+
+        for product in await self.client.filter_in(self.url, 'stock.code', lookup):
+            found[normalize_code(product.get('code') or product.get('stock', {}).get('code'))] = product
+
+        self.client.product_index.update(found.values())
+
+        return {
+            'products': {code: found[normalize_code(code)] for code in codes if normalize_code(code) in found},
+            'missing': [code for code in codes if normalize_code(code) not in found]
+        }
+
+    async def get_product_id(self, identifier: str, use_code: bool = False) -> int | None:
+        """Turn a product code (SKU) into a product ID using the product index.
+        Returns:
+            int|None: Product ID, None if the product doesn't exist
+        """
+        if not use_code:
+            return identifier
+
+        product_id = self.client.product_index.get(code=identifier)
+        if product_id is not None:
+            return product_id
+
+        product = await self.get_product_by_code(identifier, use_code=True)
+        return product.get('product_id')
+
+    async def get_product(self, identifier: str, use_code: bool = False) -> dict:
+        """Get product data with a single request, see ShoperProducts.get_product
+        Returns:
+            dict: Product data if successful, Error dict if the product doesn't exist
+        """
+        product_id = self.client.product_index.get(code=identifier) if use_code else identifier
+        if product_id is None:
+            return await self.get_product_by_code(identifier, use_code=True)
+
+        try:
+            return await self.get_product_by_code(product_id)
+        except ShoperAPIError as e:
+            if not (use_code and e.status_code == 404):
+                raise
+            # The indexed product ID is stale, look the code up instead
+            self.client.product_index.invalidate(code=identifier)
+            return await self.get_product_by_code(identifier, use_code=True)
+
+    async def create_product(self, product_data: dict) -> int | dict:
+        """Create a new product in Shoper
+        Returns:
+            int|dict: Product ID if successful, Error dict if failed
+        """
+        response = await self.client._handle_request('POST', self.url, json=product_data)
+        product_id = response.json()
+
+        if isinstance(product_id, int):
+            return product_id
+        else:
+            return {'success': False,
+                    'error': 'Response is not an integer, check the API response.'}
+
+    async def remove_product(self, product_id: str) -> bool:
+        """Remove a product from Shoper
+        Returns:
+            True: True if successful
+        """
+        await self.client._handle_request('DELETE', f'{self.url}/{product_id}')
+        self.client.product_index.invalidate(product_id=product_id)
+        return True
+
+    async def update_product_by_code(self, identifier: str, use_code: bool = False, **parameters) -> bool | dict:
+        """Update a product from Shoper
+        Args:
+            identifier (str): Product id or product code
+            use_code (bool): If True, use product code (SKU) instead of ID
+            parameters key=value: Parameters to update
+        Returns:
+            True|dict: True if successful, Error dict if failed
+        """
+        product_id = await self.get_product_id(identifier, use_code=use_code)
+        if product_id is None:
+            return {'success': False, 'error': f'Product {identifier} doesn\'t exist'}
+
+        params = {key: value for key, value in parameters.items() if value is not None}
+
+        try:
+            await self.client._handle_request('PUT', f'{self.url}/{product_id}', json=params)
+        except ShoperAPIError as e:
+            if not (use_code and e.status_code == 404):
+                raise
+            # The indexed product ID may be stale, look the code up again and retry once
+            self.client.product_index.invalidate(code=identifier)
+            fresh_product_id = await self.get_product_id(identifier, use_code=True)
+            if fresh_product_id is None or fresh_product_id == product_id:
+                raise
+            product_id = fresh_product_id
+            await self.client._handle_request('PUT', f'{self.url}/{product_id}', json=params)
+
+        if 'code' in params or 'ean' in params:
+            self.client.product_index.invalidate(product_id=product_id)
+
+        return True
+
+    async def update_products(self, updates: dict) -> dict:
+        """Update many products at the same time.
+        Args:
+            updates (dict): {product_id: {parameter: value}}
+        Returns:
+            dict: {product_id: True or the ShoperAPIError raised for it}
+        """
+        async def update(product_id, parameters):
+            try:
+                return await self.update_product_by_code(product_id, **parameters)
+            except ShoperAPIError as e:
+                return e
+
+        results = await asyncio.gather(*(update(product_id, parameters) for product_id, parameters in updates.items()))
+        return dict(zip(updates, results))
+
+    async def iter_products(self, **pagination):
+        """Stream products from Shoper page by page.
+        Args:
+            pagination: Options passed to ShoperAsyncClient.paginate (filters, start_page, end_page, max_records)
+        Yields:
+            dict: Product data
+        """
+        async for product in self.client.paginate(self.url, **pagination):
+            yield product
+
+    async def get_all_products(self, **pagination) -> list[dict]:
+        """Get all products from Shoper.
+        Returns:
+            list: List of products if successful.
+        """
+        print("ℹ️  Downloading all products...")
+        products = [product async for product in self.iter_products(**pagination)]
+        self.client.product_index.update(products)
+
+        return products
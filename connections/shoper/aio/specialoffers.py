@@ -0,0 +1,64 @@
+from .products import ShoperAsyncProducts
+from datetime import datetime
+
+
+class ShoperAsyncSpecialOffers:
+    def __init__(self, client):
+        """Initialize an asyncio Shoper Client, see ShoperSpecialOffers
+        https://developers.shoper.pl/developers/api/resources/specialoffers
+        """
+        self.client = client
+        self.products = ShoperAsyncProducts(client)
+        self.url = f'{self.client.site_url}/webapi/rest/specialoffers'
+        self.TODAY = datetime.today().strftime('%Y-%m-%d')
+
+    async def create_special_offer(self, discount_data: dict) -> int:
+        """Create a special offer for in Shoper.
+        Args:
+            discount_data (dict): product_id, discount, discount_type (2 - fixed, 3 - percentage), date_to
+                and optionally date_from (today by default)
+        Returns:
+            int: Special offer ID if successful.
+        """
+        params = {
+            'product_id': discount_data['product_id'],
+            'discount': discount_data['discount'],
+            'discount_type': discount_data['discount_type'],
+            'date_from': discount_data.get('date_from') or self.TODAY,
+            'date_to': discount_data['date_to'],
+        }
+
+        response = await self.client._handle_request('POST', self.url, json=params)
+        return response.json()
+
+    async def iter_special_offers(self, **pagination):
+        """Stream special offers from Shoper page by page."""
+        async for special_offer in self.client.paginate(self.url, **pagination):
+            yield special_offer
+
+    async def get_all_special_offers(self, **pagination) -> list[dict]:
+        """Get all special offers from Shoper.
+        Returns:
+            list: List of special offers if successful.
+        """
+        print("ℹ️  Downloading all special offers...")
+        return [special_offer async for special_offer in self.iter_special_offers(**pagination)]
+
+    async def remove_special_offer_from_product(self, identifier: str | int, use_code: bool = False) -> bool | dict:
+        """Remove a special offer from Shoper.
+        Args:
+            identifier (str): Product ID or code (SKU).
+            use_code (bool): Use product code (SKU) instead of product ID.
+        Returns:
+            True|dict: True if successful, Error dict if the product doesn't exist or has no special offer.
+        """
+        product = await self.products.get_product(identifier, use_code=use_code)
+        if product.get('product_id') is None:
+            return {'success': False, 'error': f'Product {identifier} doesn\'t exist'}
+
+        promo_id = (product.get('special_offer') or {}).get('promo_id')
+        if promo_id is None:
+            return {'success': False, 'error': f'Product {identifier} has no special offer'}
+
+        await self.client._handle_request('DELETE', f'{self.url}/{promo_id}')
+        return True
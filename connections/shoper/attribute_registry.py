@@ -0,0 +1,62 @@
+class ShoperAttributeRegistry:
+    def __init__(self, attributes: list[dict], attribute_groups: list[dict]):
+        """Attribute and attribute group lookups by ID, name and group.
+        Args:
+            attributes (list): Attributes (get_all_attributes)
+            attribute_groups (list): Attribute groups (get_all_attribute_groups)
+        """
+        self.attributes = {int(attribute['attribute_id']): attribute for attribute in attributes}
+        self.groups = {int(group['attribute_group_id']): group for group in attribute_groups}
+
+        self.attributes_by_name = {}
+        self.attributes_by_group = {}
+        for attribute in attributes:
+            self.attributes_by_name.setdefault(self._name(attribute).lower(), []).append(attribute)
+            self.attributes_by_group.setdefault(int(attribute['attribute_group_id']), []).append(attribute)
+
+        self.groups_by_name = {self._name(group).lower(): group for group in attribute_groups}
+
+    @staticmethod
+    def _name(record: dict) -> str:
+        return str(record.get('name') or (record.get('translations') or {}).get('pl_PL', {}).get('name') or '')
+
+    def get_attribute(self, attribute_id: int | str) -> dict | None:
+        return self.attributes.get(int(attribute_id))
+
+    def get_attributes_by_name(self, name: str) -> list[dict]:
+        """Attributes with this name, names repeat across groups."""
+        return self.attributes_by_name.get(name.lower(), [])
+
+    def get_attributes_by_group(self, attribute_group_id: int | str) -> list[dict]:
+        return self.attributes_by_group.get(int(attribute_group_id), [])
+
+    def get_group(self, attribute_group_id: int | str) -> dict | None:
+        return self.groups.get(int(attribute_group_id))
+
+    def get_group_by_name(self, name: str) -> dict | None:
+        return self.groups_by_name.get(name.lower())
+
+    def resolve(self, attribute: dict | int | str) -> tuple[str, str]:
+        """Turn an attribute reference into (group ID, attribute ID) as used in product data.
+        Args:
+            attribute (dict|int|str): {'id': ..., 'group': ...} like config.OUTLET_ATTRIBUTE,
+                an attribute ID or an attribute name unique across groups
+        Returns:
+            tuple: (attribute group ID, attribute ID) as strings
+        Raises:
+            KeyError: If the attribute doesn't exist or the name is ambiguous
+        """
+        if isinstance(attribute, dict):
+            return str(attribute['group']), str(attribute['id'])
+
+        if str(attribute).isdigit():
+            found = self.get_attribute(attribute)
+            if found is None:
+                raise KeyError(f'Attribute {attribute} doesn\'t exist')
+        else:
+            matches = self.get_attributes_by_name(str(attribute))
+            if len(matches) != 1:
+                raise KeyError(f'Attribute name {attribute} matches {len(matches)} attributes, use its ID')
+            found = matches[0]
+
+        return str(found['attribute_group_id']), str(found['attribute_id'])
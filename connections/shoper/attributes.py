@@ -1,5 +1,7 @@
+from .pagination import paginate, paginate_in
+from .products import ShoperProducts
+from .attribute_registry import ShoperAttributeRegistry
 import config
-from tqdm import tqdm
 
 
 class ShoperAttributes:
@@ -11,90 +13,47 @@ class ShoperAttributes:
         self.client = client
         self.url_attribute_groups = f'{self.client.site_url}/webapi/rest/attribute-groups'
         self.url_attributes = f'{self.client.site_url}/webapi/rest/attributes'
+        self.products = ShoperProducts(client)
+        self.registry = None
 
-    def get_all_attribute_groups(self):
-        """Get all attribute groups from Shoper. 
-        Returns a Data list if successful, Error dict if failed"""
-        attribute_groups = []
-        params = {
-            'limit': config.SHOPER_LIMIT,
-            'page': 1
-        }
+    def iter_attribute_groups(self, **pagination):
+        """Stream attribute groups from Shoper page by page.
+        Args:
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Yields:
+            dict: Attribute group data
+        """
+        yield from paginate(self.client, self.url_attribute_groups,
+                            desc='Downloading attribute groups', **pagination)
 
+    def get_all_attribute_groups(self, **pagination) -> list[dict]:
+        """Get all attribute groups from Shoper.
+        Args:
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Returns:
+            list: List of attribute groups if successful.
+        """
         print("ℹ️  Downloading all attribute groups...")
-        response = self.client._handle_request(
-            'GET',
-            self.url_attribute_groups,
-            params=params
-        )
-
-        if response.status_code != 200:
-            error_description = response.json().get('error_description', 'Unknown error')
-            return {'success': False, 'error': error_description}
-
-        data = response.json()
-        number_of_pages = data.get('pages', 1)
-        attribute_groups.extend(data.get('list', []))
-
-        for page in tqdm(range(2, number_of_pages + 1), 
-                         desc="Downloading attribute groups", unit=" page"):
-            
-            params['page'] = page
-            response = self.client._handle_request(
-                'GET',
-                self.url_attribute_groups,
-                params=params
-            )
-
-            if response.status_code != 200:
-                error_description = response.json().get('error_description', 'Unknown error')
-                return {'success': False, 'error': error_description}
-
-            attribute_groups.extend(response.json().get('list', []))
-
-        return attribute_groups
+        return list(self.iter_attribute_groups(**pagination))
 
-    def get_all_attributes(self):
-        """Get all attributes from Shoper. 
-        Returns a Data list if successful, Error dict if failed"""
-        attributes = []
-        params = {
-            'limit': config.SHOPER_LIMIT,
-            'page': 1
-        }
+    def iter_attributes(self, **pagination):
+        """Stream attributes from Shoper page by page.
+        Args:
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Yields:
+            dict: Attribute data
+        """
+        yield from paginate(self.client, self.url_attributes, **pagination)
 
+    def get_all_attributes(self, **pagination) -> list[dict]:
+        """Get all attributes from Shoper.
+        Args:
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Returns:
+            list: List of attributes if successful.
+        """
         print("ℹ️  Downloading all attributes...")
-        response = self.client._handle_request(
-            'GET',
-            self.url_attributes,
-            params=params
-        )
-
-        if response.status_code != 200:
-            error_description = response.json().get('error_description', 'Unknown error')
-            return {'success': False, 'error': error_description}
-
-        data = response.json()
-        number_of_pages = data.get('pages', 1)
-        attributes.extend(data.get('list', []))
-
-        for page in tqdm(range(2, number_of_pages + 1),
-                         desc="Downloading pages", unit=" page"):
-            
-            params['page'] = page
-            response = self.client._handle_request(
-                'GET',
-                self.url_attributes,
-                params=params
-            )
-
-            if response.status_code != 200:
-                error_description = response.json().get('error_description', 'Unknown error')
-                return {'success': False, 'error': error_description}
-
-            attributes.extend(response.json().get('list', []))
-
-        return attributes
+        return list(self.iter_attributes(**pagination))
 
     def get_attribute_group_by_id(self, attribute_group_id):
         """Get an attribute group by its ID
@@ -114,14 +73,19 @@ class ShoperAttributes:
         
         return response.json()
 
-    def update_attribute_group_categories(self, attribute_group_id, categories):
+    def update_attribute_group_categories(self, attribute_group_id, categories, bulk=None):
         """Update an attribute group with new categories
         Args:
             attribute_group_id (int): The ID of the attribute group to create
             categories (list): Product categories list as integers
+            bulk (ShoperBulk): If given, queue the request in this bulk batch instead of sending it
         Returns:
-            Error dict if failed, Category count if successful
+            Error dict if failed, Category count if successful, queued ShoperBulkItem if bulk is given
         """
+        if bulk is not None:
+            return bulk.add('PUT', f'{self.url_attribute_groups}/{attribute_group_id}',
+                            {'categories': categories})
+
         response = self.client._handle_request(
             'PUT',
             f'{self.url_attribute_groups}/{attribute_group_id}',
@@ -133,3 +97,81 @@ class ShoperAttributes:
             return {'success': False, 'error': error_description}
         
         return len(categories)
+
+    def get_registry(self, refresh: bool = False) -> ShoperAttributeRegistry:
+        """Get attribute lookups by ID, name and group.
+        The registry is built once per instance, the lists behind it come from the HTTP cache.
+        Args:
+            refresh (bool): If True, download the lists again bypassing the cache
+        Returns:
+            ShoperAttributeRegistry: Attribute registry
+        """
+        if self.registry is None or refresh:
+            self.registry = ShoperAttributeRegistry(
+                list(self.iter_attributes(cache=not refresh)),
+                list(self.iter_attribute_groups(cache=not refresh))
+            )
+        return self.registry
+
+    @staticmethod
+    def _product_attribute_value(product: dict, group_id: str, attribute_id: str):
+        attributes = product.get('attributes') or {}
+        if isinstance(attributes, dict):
+            return (attributes.get(group_id) or {}).get(attribute_id)
+        return None
+
+    def set_product_attribute(self, attribute: dict | int | str, value, product_ids: list[int],
+                              products=None, dry_run: bool = False, workers: int = config.SHOPER_MAX_WORKERS) -> dict:
+        """Set one attribute to the same value on many products.
+        Products already holding the value are skipped, the rest is updated in bulk batches.
+        Args:
+            attribute (dict|int|str): {'id', 'group'} like config.PRODUCT_TYPE, an attribute ID or a unique name
+            value: Attribute value
+            product_ids (list): Products to update
+            products (iterable): Current product data, e.g. ShoperCatalogMirror.iter_products(),
+                downloaded with product_id IN filters if not given
+            dry_run (bool): Only return what would change
+            workers (int): Number of filter chunks downloaded at the same time
+        Returns:
+            dict: {'updated': [product IDs], 'unchanged': [product IDs], 'failed': [product IDs],
+                   'errors': [ShoperAPIError]}, with dry_run 'updated' lists the products that would change
+        """
+        # {'id', 'group'} references are used as is, anything else is looked up in the registry
+        group_id, attribute_id = (str(attribute['group']), str(attribute['id'])) if isinstance(attribute, dict) \
+            else self.get_registry().resolve(attribute)
+        product_ids = list(dict.fromkeys(int(product_id) for product_id in product_ids))
+        wanted = set(product_ids)
+
+        if products is None:
+            products = paginate_in(self.client, self.products.url, 'product_id', product_ids, workers=workers,
+                                   desc='Downloading products')
+
+        current = {int(product['product_id']): self._product_attribute_value(product, group_id, attribute_id)
+                   for product in products if int(product['product_id']) in wanted}
+
+        result = {'updated': [], 'unchanged': [], 'failed': [], 'errors': []}
+        pending = []
+        for product_id in product_ids:
+            if product_id in current and str(current[product_id]) == str(value):
+                result['unchanged'].append(product_id)
+            else:
+                pending.append(product_id)
+
+        print(f"ℹ️  Attribute {attribute_id}: {len(pending)} products to update, "
+              f"{len(result['unchanged'])} already set")
+
+        if dry_run or not pending:
+            result['updated'] = pending
+            return result
+
+        with self.client.bulk() as bulk:
+            items = {product_id: self.products.update_product_by_code(
+                product_id, attributes={group_id: {attribute_id: value}}, bulk=bulk) for product_id in pending}
+
+        result['updated'] = [product_id for product_id, item in items.items() if item.success]
+        result['failed'] = [product_id for product_id, item in items.items() if not item.success]
+        result['errors'] = bulk.errors
+        if result['failed']:
+            print(f"❌ {len(result['failed'])} attribute updates failed: {result['failed']}")
+
+        return result
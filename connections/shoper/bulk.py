@@ -0,0 +1,149 @@
+import config, json
+from .exceptions import ShoperAPIError
+
+
+class ShoperBulkItem:
+    """A single sub-request queued in ShoperBulk. Its result is available after the batch is sent."""
+    def __init__(self, item_id: str, method: str, path: str, body=None, params: dict | None = None,
+                 on_done=None):
+        self.id = item_id
+        self.method = method
+        self.path = path
+        self.body = body
+        self.params = params
+        self.on_done = on_done
+        self.done = False
+        self.status_code = None
+        self._result = None
+        self._error = None
+
+    def to_request(self) -> dict:
+        request = {'id': self.id, 'method': self.method, 'path': self.path}
+        if self.body is not None:
+            request['body'] = self.body
+        if self.params:
+            request['params'] = self.params
+        return request
+
+    def set_response(self, url: str, sub_response: dict):
+        self.done = True
+        self.status_code = sub_response.get('code')
+        if self.status_code == 200:
+            self._result = sub_response.get('body')
+        else:
+            self._error = ShoperAPIError(_BulkItemResponse(url, self.status_code, sub_response.get('body')))
+
+        if self.on_done is not None:
+            self.on_done(self)
+
+    @property
+    def success(self) -> bool:
+        return self.done and self._error is None
+
+    def result(self):
+        """Return the sub-response body.
+        Raises:
+            ShoperAPIError: If the sub-request failed
+            RuntimeError: If the batch holding this item has not been sent yet
+        """
+        if not self.done:
+            raise RuntimeError(f'Bulk item {self.id} has not been sent yet, call flush() first')
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class _BulkItemResponse:
+    """Adapts a bulk sub-response to the response interface used by ShoperAPIError."""
+    def __init__(self, url, status_code, body):
+        self.url = url
+        self.status_code = status_code
+        self.text = json.dumps(body, ensure_ascii=False)
+        self._body = body
+
+    def json(self):
+        return self._body if isinstance(self._body, dict) else {}
+
+
+class ShoperBulk:
+    def __init__(self, client, batch_size: int = config.SHOPER_BULK_LIMIT):
+        """Queue Shoper write requests and send them in bulk calls.
+        https://developers.shoper.pl/developers/api/bulk
+        Args:
+            client (ShoperAPIClient): Connected Shoper client
+            batch_size (int): Sub-requests per bulk call, Shoper accepts up to 25
+        """
+        self.client = client
+        self.url = f'{self.client.site_url}/webapi/rest/bulk'
+        self.batch_size = min(batch_size, config.SHOPER_BULK_LIMIT)
+        self.queue = []
+        self.items = []
+        self._counter = 0
+
+    def add(self, method: str, url: str, body=None, params: dict | None = None, on_done=None) -> ShoperBulkItem:
+        """Queue a sub-request. A full batch is sent right away.
+        Args:
+            method (str): HTTP method, e.g. 'PUT'
+            url (str): Full resource url, e.g. f'{products.url}/{product_id}'
+            body: JSON body of the sub-request
+            params (dict): Query parameters of the sub-request
+            on_done (callable): Called with the item once its sub-response arrives, check item.success there
+        Returns:
+            ShoperBulkItem: Handle that maps the sub-response back to the caller
+        """
+        self._counter += 1
+        path = url.removeprefix(self.client.site_url)
+        item = ShoperBulkItem(f'{method.lower()}-{self._counter}', method, path, body, params, on_done)
+        self.queue.append(item)
+        self.items.append(item)
+
+        if len(self.queue) >= self.batch_size:
+            self.flush()
+
+        return item
+
+    def flush(self) -> list[ShoperBulkItem]:
+        """Send every queued sub-request.
+        Returns:
+            list: Items sent by this call
+        """
+        sent = []
+
+        while self.queue:
+            batch, self.queue = self.queue[:self.batch_size], self.queue[self.batch_size:]
+            response = self.client._handle_request(
+                'POST',
+                self.url,
+                json=[item.to_request() for item in batch]
+            )
+
+            sub_responses = {sub['id']: sub for sub in response.json().get('items', [])}
+            for item in batch:
+                sub_response = sub_responses.get(item.id, {'code': None, 'body': {
+                    'error': 'missing_bulk_response',
+                    'error_description': f'No response for bulk item {item.id}'
+                }})
+                item.set_response(f'{self.client.site_url}{item.path}', sub_response)
+
+            # Writes sent through /bulk never pass _handle_request with their own url, so clear cached reads here
+            written = {f'{self.client.site_url}{item.path}' for item in batch
+                       if item.success and item.method.upper() != 'GET'}
+            for url in {self.client.cache.resource_name(url): url for url in written}.values():
+                if self.client.cache.ttl_for(url) is not None:
+                    self.client.cache.invalidate(url)
+
+            sent.extend(batch)
+
+        return sent
+
+    @property
+    def errors(self) -> list[ShoperAPIError]:
+        """Errors of every failed sub-request sent so far."""
+        return [item._error for item in self.items if item.done and item._error is not None]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,132 @@
+from pathlib import Path
+from urllib.parse import urlparse
+import config, contextlib, hashlib, json, os, requests, threading, time
+
+
+class ShoperHTTPCache:
+    def __init__(self, cache_dir: str | Path = config.DATA_DIR / 'cache' / 'shoper',
+                 ttls: dict = config.SHOPER_CACHE_TTLS,
+                 max_bytes: int = config.SHOPER_CACHE_MAX_BYTES):
+        """On-disk cache for GET responses of rarely changing Shoper resources.
+        Only resources listed in `ttls` are cached. A fresh entry is returned without a request;
+        a stale one is revalidated with If-None-Match / If-Modified-Since when the server sent
+        validators, and a 304 answer renews it. Least recently used entries are evicted once
+        the cache grows over `max_bytes`.
+        Args:
+            cache_dir (str|Path): Directory holding cached responses
+            ttls (dict): Seconds a response stays fresh, per resource name (e.g. 'categories')
+            max_bytes (int): Max total size of cached responses
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def resource_name(url: str) -> str:
+        """'https://shop.pl/webapi/rest/attribute-groups/5' -> 'attribute-groups'"""
+        path = urlparse(url).path
+        return path.split('/webapi/rest/', 1)[-1].split('/', 1)[0]
+
+    def ttl_for(self, url: str) -> float | None:
+        return self.ttls.get(self.resource_name(url))
+
+    def _path(self, url: str, params: dict | None) -> Path:
+        key = json.dumps([url, sorted((params or {}).items())], default=str)
+        return self.cache_dir / f'{hashlib.sha256(key.encode()).hexdigest()}.json'
+
+    def get(self, url: str, params: dict | None = None) -> dict | None:
+        path = self._path(url, params)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        # Mark as recently used, another thread may have evicted or invalidated the file since the read
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        ttl = self.ttl_for(entry['url'])
+        return ttl is not None and time.time() - entry['stored_at'] < ttl
+
+    @staticmethod
+    def validators(entry: dict) -> dict:
+        """Conditional request headers for a stale entry."""
+        headers = {}
+        if entry['headers'].get('ETag'):
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if entry['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def store(self, url: str, params: dict | None, response: requests.Response):
+        entry = {
+            'url': url,
+            'stored_at': time.time(),
+            'headers': {key: response.headers[key] for key in ('ETag', 'Last-Modified', 'Content-Type')
+                        if key in response.headers},
+            'body': response.text,
+        }
+        self._write(self._path(url, params), entry)
+        self._evict()
+
+    def renew(self, url: str, params: dict | None, entry: dict):
+        """Mark an entry fresh again after the server answered 304 Not Modified."""
+        entry['stored_at'] = time.time()
+        self._write(self._path(url, params), entry)
+
+    def _write(self, path: Path, entry: dict):
+        temp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(entry, file, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def _evict(self):
+        with self.lock:
+            files = []
+            for path in self.cache_dir.glob('*.json'):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def invalidate(self, url: str):
+        """Drop every cached response of the resource a url belongs to."""
+        resource = self.resource_name(url)
+        with self.lock:
+            for path in self.cache_dir.glob('*.json'):
+                try:
+                    with open(path, 'r', encoding='utf-8') as file:
+                        cached_url = json.load(file)['url']
+                except (OSError, ValueError, KeyError):
+                    continue
+                if self.resource_name(cached_url) == resource:
+                    path.unlink(missing_ok=True)
+
+    def clear(self):
+        with self.lock:
+            for path in self.cache_dir.glob('*.json'):
+                path.unlink(missing_ok=True)
+
+    @staticmethod
+    def to_response(entry: dict) -> requests.Response:
+        """Rebuild a requests.Response from a cached entry."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry['url']
+        response.headers.update(entry['headers'])
+        response.encoding = 'utf-8'
+        response._content = entry['body'].encode('utf-8')
+        return response
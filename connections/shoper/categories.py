@@ -1,6 +1,7 @@
+from .pagination import paginate
+from .category_tree import ShoperCategoryTree
+from utils.helpers.helper_functions import export_to_ndjson
 import config
-from tqdm import tqdm
-from utils.helpers.helper_functions import export_to_json
 
 
 class ShoperCategories:
@@ -10,33 +11,58 @@ class ShoperCategories:
         """
         self.client = client
         self.url = f'{self.client.site_url}/webapi/rest/categories'
+        self.url_tree = f'{self.client.site_url}/webapi/rest/categories-tree'
+        self.tree_file = config.DATA_DIR / 'shoper_category_tree.json'
 
-    def get_all_categories(self, export: bool = True) -> list[dict]:
+    def iter_categories(self, **pagination):
+        """Stream categories from Shoper page by page.
+        Args:
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Yields:
+            dict: Category data
+        """
+        yield from paginate(self.client, self.url, **pagination)
+
+    def get_all_categories(self, export: bool = True, **pagination) -> list[dict]:
         """Get all categories from Shoper.
         Args:
-            export (bool): If True, export the categories to a JSON file.
+            export (bool): If True, export the categories to an NDJSON file.
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
         Returns:
             list: List of categories if successful.
         """
-        categories = []
-        params = {
-            'limit': config.SHOPER_LIMIT,
-            'page': 1
-        }
-
         print("ℹ️  Downloading all categories...")
-        data = self.client._handle_request('GET', self.url, params=params).json()
-        number_of_pages = data['pages']
-        categories.extend(data.get('list', []))
-
-        for page in tqdm(range(2, number_of_pages + 1),
-                         desc="Downloading pages", unit=" page"):
-            
-            params['page'] = page
-            data = self.client._handle_request('GET', self.url, params=params).json()
-            categories.extend(data.get('list', []))
+        categories = list(self.iter_categories(**pagination))
 
         if export:
-            export_to_json(categories, 'shoper/shoper_categories.json')
+            export_to_ndjson(categories, 'shoper/shoper_categories.ndjson')
 
         return categories
+
+    def get_categories_tree(self, cache: bool = True) -> list[dict]:
+        """Get the nested category hierarchy: [{'id': 1, 'children': [{'id': 2, 'children': []}]}]
+        Args:
+            cache (bool): If False, bypass the client's GET cache
+        """
+        response = self.client._handle_request('GET', self.url_tree, cache=cache)
+        return response.json()
+
+    def get_category_tree(self, refresh: bool = False, ttl: float = config.SHOPER_CATEGORY_TREE_TTL) -> ShoperCategoryTree:
+        """Get the category tree with precomputed ancestors, descendants and paths.
+        The tree is kept in the data directory and rebuilt from the API once it's older than ttl.
+        Args:
+            refresh (bool): If True, rebuild the tree from the API even if the saved one or cached responses are fresh
+            ttl (float): Seconds a saved tree stays valid
+        Returns:
+            ShoperCategoryTree: Category tree
+        """
+        if not refresh:
+            tree = ShoperCategoryTree.load(self.tree_file, ttl)
+            if tree is not None:
+                return tree
+
+        # A refresh must not rebuild the tree from cached responses up to SHOPER_CACHE_TTLS old
+        tree = ShoperCategoryTree(self.get_all_categories(export=False, cache=not refresh),
+                                  self.get_categories_tree(cache=not refresh))
+        tree.save(self.tree_file)
+        return tree
@@ -0,0 +1,123 @@
+from datetime import datetime
+from pathlib import Path
+import json, os, time
+
+
+class ShoperCategoryTree:
+    def __init__(self, categories: list[dict], tree: list[dict], built_at: float | None = None):
+        """Category hierarchy with precomputed lookups.
+        Parents, ancestors, descendants and breadcrumb paths are computed once when the tree is
+        built, so subtree checks and breadcrumbs are dictionary lookups afterwards.
+        Args:
+            categories (list): Flat category list (get_all_categories), used for names
+            tree (list): Nested tree from the categories-tree endpoint: [{'id': 1, 'children': [...]}]
+            built_at (float): Timestamp of the data, now by default
+        """
+        self.categories = {int(category['category_id']): category for category in categories}
+        self.tree = tree
+        self.built_at = built_at or time.time()
+
+        self.parent = {}
+        self.children = {}
+        self.ancestors = {}
+        self.descendants = {}
+        self.paths = {}
+        self._build()
+
+    def _name(self, category_id: int) -> str:
+        category = self.categories.get(category_id, {})
+        return (category.get('translations') or {}).get('pl_PL', {}).get('name') or str(category_id)
+
+    def _build(self):
+        # Walk the tree depth first without recursion, parents are always visited before children
+        stack = [(None, node) for node in reversed(self.tree)]
+        order = []
+        while stack:
+            parent_id, node = stack.pop()
+            category_id = int(node['id'])
+            self.parent[category_id] = parent_id
+            self.children[category_id] = [int(child['id']) for child in node.get('children') or []]
+            self.ancestors[category_id] = (self.ancestors[parent_id] | {parent_id}) if parent_id is not None \
+                else frozenset()
+            self.paths[category_id] = f'{self.paths[parent_id]} > {self._name(category_id)}' if parent_id is not None \
+                else self._name(category_id)
+            order.append(category_id)
+            stack.extend((category_id, child) for child in reversed(node.get('children') or []))
+
+        # Categories missing from the tree endpoint are treated as roots
+        for category_id in self.categories.keys() - self.parent.keys():
+            self.parent[category_id] = None
+            self.children[category_id] = []
+            self.ancestors[category_id] = frozenset()
+            self.paths[category_id] = self._name(category_id)
+            order.append(category_id)
+
+        # Children before parents, so each node's set is complete when its parent needs it
+        for category_id in reversed(order):
+            descendants = set()
+            for child_id in self.children[category_id]:
+                descendants.add(child_id)
+                descendants |= self.descendants[child_id]
+            self.descendants[category_id] = frozenset(descendants)
+
+    def get_parent(self, category_id: int) -> int | None:
+        return self.parent.get(int(category_id))
+
+    def get_ancestors(self, category_id: int) -> frozenset:
+        return self.ancestors.get(int(category_id), frozenset())
+
+    def get_descendants(self, category_id: int, include_self: bool = False) -> frozenset:
+        descendants = self.descendants.get(int(category_id), frozenset())
+        return descendants | {int(category_id)} if include_self else descendants
+
+    def get_path(self, category_id: int) -> str | None:
+        """Breadcrumb, e.g. 'Etui > Apple > iPhone 15'"""
+        return self.paths.get(int(category_id))
+
+    def is_in_subtree(self, category_id: int, root_id: int) -> bool:
+        """Check if a category is root_id itself or one of its descendants."""
+        category_id, root_id = int(category_id), int(root_id)
+        return category_id == root_id or root_id in self.ancestors.get(category_id, ())
+
+    def get_subtree_ids(self, root_ids: list[int]) -> set[int]:
+        """Every category in the subtrees of root_ids, e.g. for update_attribute_group_categories."""
+        subtree = set()
+        for root_id in root_ids:
+            subtree |= self.get_descendants(root_id, include_self=True)
+        return subtree
+
+    def __contains__(self, category_id) -> bool:
+        return int(category_id) in self.parent
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def save(self, filepath: str | Path):
+        filepath = Path(filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        temp_filepath = filepath.with_name(f'.{filepath.name}.tmp')
+        with open(temp_filepath, 'w', encoding='utf-8') as file:
+            json.dump({'built_at': self.built_at, 'categories': list(self.categories.values()), 'tree': self.tree},
+                      file, ensure_ascii=False)
+        os.replace(temp_filepath, filepath)
+
+    @classmethod
+    def load(cls, filepath: str | Path, ttl: float | None = None):
+        """Load a saved tree.
+        Returns:
+            ShoperCategoryTree|None: The tree, None if the file is missing, broken or older than ttl seconds
+        """
+        try:
+            with open(filepath, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if ttl is not None and time.time() - data['built_at'] > ttl:
+            return None
+
+        return cls(data['categories'], data['tree'], data['built_at'])
+
+    def __repr__(self) -> str:
+        built_at = datetime.fromtimestamp(self.built_at).isoformat(timespec='seconds')
+        return f'<ShoperCategoryTree {len(self)} categories, built {built_at}>'
@@ -1,40 +1,88 @@
 import requests, time
 import config
 from .exceptions import ShoperAPIError
+from .bulk import ShoperBulk
+from .rate_limiter import ShoperRateLimiter
+from .product_index import ShoperProductIndex
+from .cache import ShoperHTTPCache
+from utils.helpers.metrics import request_metrics
 
 
 class ShoperAPIClient:
-    def __init__(self):
+    def __init__(self, rate_limiter: ShoperRateLimiter | None = None, cache: ShoperHTTPCache | None = None):
+        """Initialize a Shoper Client
+        Args:
+            rate_limiter (ShoperRateLimiter): Limiter shared with other clients of the same shop,
+                a new one is created if not given. Threads using this client always share it.
+            cache (ShoperHTTPCache): Cache for GET responses, a default one is created if not given
+        """
         self.site_url = config.SHOPER_SITE_URL
         self.login = config.SHOPER_LOGIN
         self.password = config.SHOPER_PASSWORD
         self.session = requests.Session()
         self.token = None
-        
-    def _handle_request(self, method, url, max_retries=5, backoff_factor=1.5, **kwargs):
-        """Handle API requests with automatic retry on 429 and 5xx errors."""
+        self.rate_limiter = rate_limiter or ShoperRateLimiter()
+        self._product_index = None
+        self.cache = cache or ShoperHTTPCache()
+
+    def _handle_request(self, method, url, max_retries=5, backoff_factor=1.5, cache=True, **kwargs):
+        """Handle API requests with automatic retry on 429 and 5xx errors.
+        GET requests to resources listed in SHOPER_CACHE_TTLS are served from the cache,
+        pass cache=False to always ask the server."""
         attempt = 0
+        params = kwargs.get('params')
+        cached = None
+        use_cache = cache and method == 'GET' and self.cache.ttl_for(url) is not None
+
+        if use_cache:
+            cached = self.cache.get(url, params)
+            if cached is not None and self.cache.is_fresh(cached):
+                request_metrics.record('shoper', method, url, 'cached', 0.0)
+                return self.cache.to_response(cached)
+            if cached is not None:
+                kwargs['headers'] = {**kwargs.get('headers', {}), **self.cache.validators(cached)}
 
         while attempt < max_retries:
+            waited = self.rate_limiter.acquire()
+            request_metrics.record_sleep('shoper', method, url, waited)
+
+            start = time.perf_counter()
             response = self.session.request(method, url, **kwargs)
+            request_metrics.record('shoper', method, url, response.status_code,
+                                   time.perf_counter() - start, len(response.content))
+            self.rate_limiter.update_from_headers(response.headers)
+
+            if response.status_code == 304 and cached is not None:
+                self.cache.renew(url, params, cached)
+                return self.cache.to_response(cached)
 
             if response.status_code == 429:
                 retry_after = int(response.headers.get('Retry-After', 1))
-                time.sleep(retry_after)
+                self.rate_limiter.penalize(retry_after)
+                request_metrics.record_retry('shoper', method, url, 429, retry_after)
                 attempt += 1
                 continue
 
             elif response.status_code in {500, 502, 503, 504}:
                 wait = backoff_factor ** attempt
+                request_metrics.record_retry('shoper', method, url, response.status_code, wait)
                 time.sleep(wait)
                 attempt += 1
                 continue
 
             if response.status_code != 200:
                 raise ShoperAPIError(response)
-            
+
+            if use_cache:
+                self.cache.store(url, params, response)
+            elif method != 'GET' and self.cache.ttl_for(url) is not None:
+                self.cache.invalidate(url)
+
             return response
-            
+
+        # Every attempt ended with 429 or 5xx, report the last answer instead of returning None
+        raise ShoperAPIError(response)
+
     def connect(self):
         """Authenticate with the API"""
         response = self._handle_request(
@@ -51,6 +99,25 @@ class ShoperAPIClient:
         self.session.headers.update({'Authorization': f'Bearer {self.token}'})
         return {'success': True}
     
+    def bulk(self, batch_size: int = config.SHOPER_BULK_LIMIT) -> ShoperBulk:
+        """Start a batch of write requests sent through the /bulk endpoint.
+        Use it as a context manager to send the remaining items on exit:
+            with client.bulk() as bulk:
+                products.update_product_by_code(product_id, stock={'price': 10}, bulk=bulk)
+        Args:
+            batch_size (int): Sub-requests per bulk call, Shoper accepts up to 25
+        Returns:
+            ShoperBulk: Queue of write requests
+        """
+        return ShoperBulk(self, batch_size)
+
+    @property
+    def product_index(self) -> ShoperProductIndex:
+        """SKU/EAN -> product_id index shared by every resource using this client."""
+        if self._product_index is None:
+            self._product_index = ShoperProductIndex()
+        return self._product_index
+
     @property
     def is_connected(self):
         return self.token is not None
\ No newline at end of file
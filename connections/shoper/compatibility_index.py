@@ -0,0 +1,163 @@
+from bisect import bisect_left, insort
+from pathlib import Path
+import config, json, os, re, threading, time
+
+SEPARATORS = re.compile(r'[,;\n]')
+
+
+def normalize_model(model: str) -> str:
+    """' iPhone  16 Pro ' -> 'iphone 16 pro'"""
+    return ' '.join(str(model).lower().split())
+
+
+def parse_models(value) -> list[str]:
+    """Device models of a metafield value: a JSON list or text separated by commas, semicolons or new lines."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = SEPARATORS.split(value)
+    if not isinstance(value, list):
+        value = [value]
+    return list(dict.fromkeys(model for model in map(normalize_model, value) if model))
+
+
+class ShoperCompatibilityIndex:
+    def __init__(self, index_path: str | Path = config.DATA_DIR / 'shoper_compatibility_index.json'):
+        """Inverted device model -> product IDs index over a compatibility metafield.
+        Models are normalized (lower case, single spaces) and kept sorted, so exact lookups are
+        dictionary hits and prefix queries are a binary search. The index is saved as JSON and
+        updated per product, so a changed value doesn't need a full rebuild.
+        Usage:
+            index = ShoperCompatibilityIndex()
+            index.rebuild(metafield_values.iter_metafield_values(metafield_id))
+            index.find_prefix('iphone 16')  # iPhone 16, 16 Plus, 16 Pro, 16 Pro Max
+        Args:
+            index_path (str|Path): JSON file holding the index
+        """
+        self.index_path = Path(index_path)
+        self.lock = threading.Lock()
+        self.product_models = {}
+        self.model_products = {}
+        self.models = []
+        self.updated_at = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        self.updated_at = data.get('updated_at')
+        for product_id, models in data.get('products', {}).items():
+            self._set(int(product_id), models)
+
+    def save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_name(f'.{self.index_path.name}.tmp')
+        with self.lock:
+            data = {'updated_at': self.updated_at, 'products': self.product_models}
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False)
+        os.replace(temp_path, self.index_path)
+
+    def _set(self, product_id: int, models: list[str]):
+        """Replace the models of one product in the inverted map."""
+        self._remove(product_id)
+        if not models:
+            return
+
+        self.product_models[product_id] = models
+        for model in models:
+            products = self.model_products.get(model)
+            if products is None:
+                products = self.model_products[model] = set()
+                insort(self.models, model)
+            products.add(product_id)
+
+    def _remove(self, product_id: int):
+        for model in self.product_models.pop(product_id, []):
+            products = self.model_products.get(model)
+            if products is None:
+                continue
+            products.discard(product_id)
+            if not products:
+                del self.model_products[model]
+                del self.models[bisect_left(self.models, model)]
+
+    def update(self, values, save: bool = True) -> int:
+        """Index changed metafield values.
+        Args:
+            values (iterable|dict): Metafield value records ({'object_id', 'value'}) or {product_id: value},
+                an empty value removes the product from the index
+            save (bool): Save the index afterwards
+        Returns:
+            int: Number of products updated
+        """
+        items = values.items() if isinstance(values, dict) \
+            else ((record['object_id'], record.get('value')) for record in values)
+
+        count = 0
+        with self.lock:
+            for product_id, value in items:
+                self._set(int(product_id), parse_models(value) if value else [])
+                count += 1
+            self.updated_at = time.time()
+
+        if save:
+            self.save()
+        return count
+
+    def rebuild(self, values) -> int:
+        """Replace the whole index, e.g. with ShoperMetafieldValues.iter_metafield_values(metafield_id)."""
+        with self.lock:
+            self.product_models = {}
+            self.model_products = {}
+            self.models = []
+        return self.update(values)
+
+    def remove_product(self, product_id: int, save: bool = True):
+        with self.lock:
+            self._remove(int(product_id))
+        if save:
+            self.save()
+
+    def get(self, model: str) -> set[int]:
+        """Products compatible with exactly this model."""
+        return set(self.model_products.get(normalize_model(model), ()))
+
+    def get_models(self, product_id: int) -> list[str]:
+        return list(self.product_models.get(int(product_id), []))
+
+    def models_with_prefix(self, prefix: str) -> list[str]:
+        """Indexed models starting with prefix, in alphabetical order."""
+        prefix = normalize_model(prefix)
+        start = bisect_left(self.models, prefix)
+        end = bisect_left(self.models, prefix + '\uffff', start)
+        return self.models[start:end]
+
+    def find_prefix(self, prefix: str) -> set[int]:
+        """Products compatible with any model starting with prefix, e.g. 'iphone 16'."""
+        products = set()
+        for model in self.models_with_prefix(prefix):
+            products |= self.model_products[model]
+        return products
+
+    def find_any(self, models: list[str]) -> set[int]:
+        """Products compatible with at least one of the models."""
+        products = set()
+        for model in models:
+            products |= self.model_products.get(normalize_model(model), set())
+        return products
+
+    def find_all(self, models: list[str]) -> set[int]:
+        """Products compatible with every one of the models."""
+        sets = sorted((self.model_products.get(normalize_model(model), set()) for model in models), key=len)
+        if not sets:
+            return set()
+        return set(sets[0]).intersection(*sets[1:])
+
+    def __len__(self) -> int:
+        return len(self.product_models)
@@ -1,6 +1,5 @@
-import config
-from tqdm import tqdm
-from utils.helpers.helper_functions import export_to_json
+from .pagination import paginate
+from utils.helpers.helper_functions import export_to_ndjson
 
 
 class ShoperGauges:
@@ -9,32 +8,27 @@ class ShoperGauges:
         self.client = client
         self.url = f'{self.client.site_url}/webapi/rest/gauges'
 
-    def get_all_gauges(self, export: bool = True) -> list[dict]:
-        """Get all Gauges from Shoper.
+    def iter_gauges(self, **pagination):
+        """Stream gauges from Shoper page by page.
         Args:
-            export (bool): If True, export the gauges to a JSON file.
-        Returns:
-            list: List of Gauges if successful.
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Yields:
+            dict: Gauge data
         """
-        gauges = []
-        params = {
-            'limit': config.SHOPER_LIMIT,
-            'page': 1
-        }
+        yield from paginate(self.client, self.url, **pagination)
 
+    def get_all_gauges(self, export: bool = True, **pagination) -> list[dict]:
+        """Get all gauges from Shoper.
+        Args:
+            export (bool): If True, export the gauges to an NDJSON file.
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Returns:
+            list: List of gauges if successful.
+        """
         print("ℹ️  Downloading all gauges...")
-        data = self.client._handle_request('GET', self.url, params=params).json()
-        number_of_pages = data.get('pages', 1)
-        gauges.extend(data.get('list', []))
-
-        for page in tqdm(range(2, number_of_pages + 1),
-                         desc="Downloading pages", unit=" page"):
-            
-            params['page'] = page
-            data = self.client._handle_request( 'GET', self.url, params=params).json()
-            gauges.extend(data.get('list', []))
+        gauges = list(self.iter_gauges(**pagination))
 
         if export:
-            export_to_json(gauges, 'shoper/shoper_gauges.json')
+            export_to_ndjson(gauges, 'shoper/shoper_gauges.ndjson')
 
         return gauges
@@ -1,6 +1,8 @@
 import config
 from tqdm import tqdm
 import json
+from .pagination import paginate
+from utils.helpers.helper_functions import export_to_ndjson
 
 
 class ShoperMetafieldValues:
@@ -9,4 +11,157 @@ class ShoperMetafieldValues:
         https://developers.shoper.pl/developers/api/resources/metafield-values
         """
         self.client = client
-        self.url = f'{self.client.site_url}/webapi/rest/metafield-values'
\ No newline at end of file
+        self.url = f'{self.client.site_url}/webapi/rest/metafield-values'
+
+    @staticmethod
+    def _serialize(value) -> str:
+        """Values are stored as text, lists and dicts (e.g. compatible device models) as JSON."""
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return str(value)
+
+    def create_metafield_value(self, metafield_id: int, object_id: int, value, bulk=None) -> int:
+        """Set a metafield value on an object (e.g. a product).
+        Args:
+            metafield_id (int): Metafield ID
+            object_id (int): ID of the object, e.g. product ID
+            value: Value, lists and dicts are saved as JSON
+            bulk (ShoperBulk): If given, queue the request in this bulk batch instead of sending it
+        Returns:
+            int|ShoperBulkItem: Metafield value ID if successful, queued item if bulk is given
+        """
+        params = {
+            'metafield_id': int(metafield_id),
+            'object_id': int(object_id),
+            'value': self._serialize(value),
+        }
+
+        if bulk is not None:
+            return bulk.add('POST', self.url, params)
+
+        return self.client._handle_request('POST', self.url, json=params).json()
+
+    def update_metafield_value(self, value_id: int, value, bulk=None) -> bool:
+        """Change an existing metafield value.
+        Args:
+            value_id (int): Metafield value ID
+            value: New value, lists and dicts are saved as JSON
+            bulk (ShoperBulk): If given, queue the request in this bulk batch instead of sending it
+        Returns:
+            True|ShoperBulkItem: True if successful, queued item if bulk is given
+        """
+        params = {'value': self._serialize(value)}
+
+        if bulk is not None:
+            return bulk.add('PUT', f'{self.url}/{value_id}', params)
+
+        self.client._handle_request('PUT', f'{self.url}/{value_id}', json=params)
+        return True
+
+    def remove_metafield_value(self, value_id: int, bulk=None) -> bool:
+        """Remove a metafield value.
+        Args:
+            value_id (int): Metafield value ID
+            bulk (ShoperBulk): If given, queue the request in this bulk batch instead of sending it
+        Returns:
+            True|ShoperBulkItem: True if successful, queued item if bulk is given
+        """
+        if bulk is not None:
+            return bulk.add('DELETE', f'{self.url}/{value_id}')
+
+        self.client._handle_request('DELETE', f'{self.url}/{value_id}')
+        return True
+
+    def iter_metafield_values(self, metafield_id: int | None = None, **pagination):
+        """Stream metafield values from Shoper page by page.
+        Args:
+            metafield_id (int): Only values of this metafield, all values if None
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Yields:
+            dict: Metafield value data
+        """
+        if metafield_id is not None:
+            pagination['filters'] = {**(pagination.get('filters') or {}), 'metafield_id': int(metafield_id)}
+
+        yield from paginate(self.client, self.url, desc='Downloading metafield values', **pagination)
+
+    def get_all_metafield_values(self, metafield_id: int | None = None, export: bool = True, **pagination) -> list[dict]:
+        """Get all values of a metafield.
+        Args:
+            metafield_id (int): Only values of this metafield, all values if None
+            export (bool): If True, export the values to an NDJSON file.
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Returns:
+            list: List of metafield values if successful
+        """
+        print("ℹ️  Downloading all metafield values...")
+        values = list(self.iter_metafield_values(metafield_id, **pagination))
+
+        if export:
+            suffix = f'_{metafield_id}' if metafield_id is not None else ''
+            export_to_ndjson(values, f'shoper/shoper_metafield_values{suffix}.ndjson')
+
+        return values
+
+    def upsert_metafield_values(self, metafield_id: int, values: dict, remove_missing: bool = False,
+                                dry_run: bool = False, workers: int = config.SHOPER_MAX_WORKERS,
+                                index=None) -> dict:
+        """Bring the values of one metafield in line with the given ones, writing only changes.
+        Current values are downloaded once, then missing ones are created, different ones
+        updated and (optionally) values of objects not given removed, all in bulk batches.
+        Args:
+            metafield_id (int): Metafield ID, e.g. of product_compatibility
+            values (dict): {object_id: value}
+            remove_missing (bool): Also remove values of objects that are not in values
+            dry_run (bool): Only return what would change
+            workers (int): Number of pages of current values downloaded at the same time
+            index (ShoperCompatibilityIndex): If given, updated with the values saved successfully
+        Returns:
+            dict: {'created': [object IDs], 'updated': [object IDs], 'removed': [object IDs],
+                   'unchanged': int, 'errors': [ShoperAPIError]}
+        """
+        desired = {int(object_id): self._serialize(value) for object_id, value in values.items()}
+        current = {int(value['object_id']): value
+                   for value in self.iter_metafield_values(metafield_id, workers=workers)}
+
+        result = {'created': [], 'updated': [], 'removed': [], 'unchanged': 0, 'errors': []}
+        for object_id, value in desired.items():
+            if object_id not in current:
+                result['created'].append(object_id)
+            elif str(current[object_id].get('value')) != value:
+                result['updated'].append(object_id)
+            else:
+                result['unchanged'] += 1
+
+        if remove_missing:
+            result['removed'] = [object_id for object_id in current if object_id not in desired]
+
+        print(f"ℹ️  Metafield {metafield_id}: {len(result['created'])} to create, {len(result['updated'])} to update, "
+              f"{len(result['removed'])} to remove, {result['unchanged']} unchanged")
+
+        if dry_run or not (result['created'] or result['updated'] or result['removed']):
+            return result
+
+        writes = len(result['created']) + len(result['updated']) + len(result['removed'])
+        items = []
+        with self.client.bulk() as bulk, tqdm(total=writes, desc='Saving metafield values', unit=' value') as progress:
+            for object_id in result['created']:
+                items.append((object_id, desired[object_id],
+                              self.create_metafield_value(metafield_id, object_id, desired[object_id], bulk=bulk)))
+                progress.update()
+            for object_id in result['updated']:
+                items.append((object_id, desired[object_id],
+                              self.update_metafield_value(current[object_id]['value_id'], desired[object_id], bulk=bulk)))
+                progress.update()
+            for object_id in result['removed']:
+                items.append((object_id, None, self.remove_metafield_value(current[object_id]['value_id'], bulk=bulk)))
+                progress.update()
+
+        if index is not None:
+            index.update({object_id: value for object_id, value, item in items if item.success})
+
+        result['errors'] = bulk.errors
+        if result['errors']:
+            print(f"❌ {len(result['errors'])} metafield values could not be saved")
+
+        return result
@@ -1,7 +1,5 @@
-import config
-from tqdm import tqdm
-import json
-from utils.helpers.helper_functions import export_to_json
+from .pagination import paginate
+from utils.helpers.helper_functions import export_to_json, export_to_ndjson
 
 
 class ShoperMetafields:
@@ -45,36 +43,29 @@ class ShoperMetafields:
 
         return data
     
-    def get_all_metafields(self, object_type: str = 'product', export: bool = True) -> list[dict]:
+    def iter_metafields(self, object_type: str = 'product', **pagination):
+        """Stream metafields from Shoper page by page.
+        Args:
+            object_type (str): Type of object to get metafields for. Default is 'product'.
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Yields:
+            dict: Metafield data
+        """
+        yield from paginate(self.client, f'{self.url}/{object_type}', **pagination)
+
+    def get_all_metafields(self, object_type: str = 'product', export: bool = True, **pagination) -> list[dict]:
         """Get all metafields.
         Args:
             object_type (str): Type of object to get metafields for. Default is 'product'.
-            export (bool): If True, export the metafields to a JSON file.
+            export (bool): If True, export the metafields to an NDJSON file.
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
         Returns:
             list: List of metafields if successful
         """
-        metafields = []
-        params = {
-            'limit': config.SHOPER_LIMIT,
-            'page': 1,
-        }
-
         print("ℹ️  Downloading all metafields...")
-        data = self.client._handle_request('GET', f'{self.url}/{object_type}', 
-                                           params=params).json()
-        
-        number_of_pages = data.get('pages', 1)
-        metafields.extend(data.get('list', []))
-
-        for page in tqdm(range(2, number_of_pages + 1), 
-                        desc='Downloading pages', unit=' page'):
-            
-            params['page'] = page
-            data = self.client._handle_request('GET', f'{self.url}/{object_type}',
-                                               params=params).json()
-            metafields.extend(data.get('list', []))
+        metafields = list(self.iter_metafields(object_type, **pagination))
 
         if export:
-            export_to_json(data, f'shoper/shoper_metafields_{object_type}.json')
+            export_to_ndjson(metafields, f'shoper/shoper_metafields_{object_type}.ndjson')
 
         return metafields
@@ -0,0 +1,283 @@
+from .products import ShoperProducts
+from .specialoffers import ShoperSpecialOffers
+from .redirects import ShoperRedirects
+from .categories import ShoperCategories
+from .attributes import ShoperAttributes
+from pathlib import Path
+import config, json, sqlite3
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id INTEGER PRIMARY KEY,
+    code TEXT,
+    ean TEXT,
+    category_id INTEGER,
+    edit_date TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_code ON products (code);
+CREATE INDEX IF NOT EXISTS idx_products_ean ON products (ean);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category_id);
+
+CREATE TABLE IF NOT EXISTS product_categories (
+    product_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    PRIMARY KEY (category_id, product_id)
+);
+CREATE INDEX IF NOT EXISTS idx_product_categories_product ON product_categories (product_id);
+
+CREATE TABLE IF NOT EXISTS special_offers (
+    promo_id INTEGER PRIMARY KEY,
+    product_id INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_special_offers_product ON special_offers (product_id);
+
+CREATE TABLE IF NOT EXISTS redirects (
+    redirect_id INTEGER PRIMARY KEY,
+    route TEXT,
+    target TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_redirects_route ON redirects (route);
+CREATE INDEX IF NOT EXISTS idx_redirects_target ON redirects (target);
+
+CREATE TABLE IF NOT EXISTS categories (
+    category_id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS attributes (
+    attribute_id INTEGER PRIMARY KEY,
+    attribute_group_id INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attributes_group ON attributes (attribute_group_id);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    resource TEXT PRIMARY KEY,
+    cursor TEXT
+);
+"""
+
+
+def _product_code(product: dict):
+    return product.get('code') or product.get('stock', {}).get('code')
+
+
+def _product_ean(product: dict):
+    return product.get('ean') or product.get('stock', {}).get('ean')
+
+
+class ShoperCatalogMirror:
+    def __init__(self, client, db_path: str | Path = config.DATA_DIR / 'shoper_mirror.sqlite'):
+        """Local SQLite copy of the Shoper catalog.
+        The first sync downloads everything, later product syncs only fetch products whose
+        edit_date is at or after the newest edit_date already stored. Reads by SKU, EAN,
+        category and product ID are served from indexed local queries.
+        Args:
+            client (ShoperAPIClient): Connected Shoper client
+            db_path (str|Path): SQLite database file
+        """
+        self.client = client
+        self.products = ShoperProducts(client)
+        self.special_offers = ShoperSpecialOffers(client)
+        self.redirects = ShoperRedirects(client)
+        self.categories = ShoperCategories(client)
+        self.attributes = ShoperAttributes(client)
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Sync
+
+    def _get_cursor(self, resource: str) -> str | None:
+        row = self.db.execute('SELECT cursor FROM sync_state WHERE resource = ?', (resource,)).fetchone()
+        return row['cursor'] if row else None
+
+    def _set_cursor(self, resource: str, cursor: str):
+        self.db.execute('INSERT OR REPLACE INTO sync_state (resource, cursor) VALUES (?, ?)', (resource, cursor))
+
+    def sync(self, full: bool = False, workers: int = config.SHOPER_MAX_WORKERS) -> dict:
+        """Sync every mirrored resource.
+        Args:
+            full (bool): If True, reload products from scratch instead of fetching changes only
+            workers (int): Number of pages downloaded at the same time
+        Returns:
+            dict: Number of records written per resource
+        """
+        return {
+            'products': self.sync_products(full=full, workers=workers),
+            'special_offers': self.sync_special_offers(workers=workers),
+            'redirects': self.sync_redirects(workers=workers),
+            'categories': self.sync_categories(workers=workers),
+            'attributes': self.sync_attributes(workers=workers),
+        }
+
+    def sync_products(self, full: bool = False, workers: int = config.SHOPER_MAX_WORKERS) -> int:
+        """Download new and changed products.
+        Products removed in Shoper are only dropped from the mirror on a full sync.
+        Args:
+            full (bool): If True, reload all products instead of fetching changes only
+            workers (int): Number of pages downloaded at the same time
+        Returns:
+            int: Number of products written
+        """
+        cursor = None if full else self._get_cursor('products')
+        filters = {'edit_date': {'>=': cursor}} if cursor else None
+
+        print("ℹ️  Syncing products" + (f" changed since {cursor}..." if cursor else "..."))
+        count = 0
+        newest = cursor
+        indexed = []
+
+        with self.db:
+            if cursor is None:
+                self.db.execute('DELETE FROM products')
+                self.db.execute('DELETE FROM product_categories')
+
+            for product in self.products.iter_products(filters=filters, workers=workers):
+                self._store_product(product)
+                indexed.append(product)
+                if len(indexed) >= 1000:
+                    self.client.product_index.update(indexed)
+                    indexed = []
+                edit_date = product.get('edit_date')
+                if edit_date and (newest is None or edit_date > newest):
+                    newest = edit_date
+                count += 1
+
+            self.client.product_index.update(indexed)
+            if newest:
+                self._set_cursor('products', newest)
+
+        return count
+
+    def _store_product(self, product: dict):
+        product_id = int(product['product_id'])
+        self.db.execute(
+            'INSERT OR REPLACE INTO products (product_id, code, ean, category_id, edit_date, data) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (product_id, _product_code(product), _product_ean(product), product.get('category_id'),
+             product.get('edit_date'), json.dumps(product, ensure_ascii=False))
+        )
+
+        category_ids = set(product.get('categories') or [])
+        if product.get('category_id'):
+            category_ids.add(product['category_id'])
+
+        self.db.execute('DELETE FROM product_categories WHERE product_id = ?', (product_id,))
+        self.db.executemany(
+            'INSERT OR IGNORE INTO product_categories (product_id, category_id) VALUES (?, ?)',
+            [(product_id, int(category_id)) for category_id in category_ids]
+        )
+
+    def store_products(self, products: list[dict]):
+        """Write products changed locally, e.g. right after sending an update, without waiting for the next sync."""
+        with self.db:
+            for product in products:
+                self._store_product(product)
+
+    def _replace_table(self, table: str, columns: tuple, rows) -> int:
+        """Reload a whole table. Used for resources without an edit date to sync on."""
+        placeholders = ', '.join('?' for _ in columns)
+        count = 0
+
+        with self.db:
+            self.db.execute(f'DELETE FROM {table}')
+            for row in rows:
+                self.db.execute(f'INSERT OR REPLACE INTO {table} ({", ".join(columns)}) VALUES ({placeholders})', row)
+                count += 1
+
+        return count
+
+    def sync_special_offers(self, workers: int = config.SHOPER_MAX_WORKERS) -> int:
+        print("ℹ️  Syncing special offers...")
+        return self._replace_table(
+            'special_offers', ('promo_id', 'product_id', 'data'),
+            ((offer['promo_id'], offer.get('product_id'), json.dumps(offer, ensure_ascii=False))
+             for offer in self.special_offers.iter_special_offers(workers=workers))
+        )
+
+    def sync_redirects(self, workers: int = config.SHOPER_MAX_WORKERS) -> int:
+        print("ℹ️  Syncing redirects...")
+        return self._replace_table(
+            'redirects', ('redirect_id', 'route', 'target', 'data'),
+            ((redirect['redirect_id'], redirect.get('route'), redirect.get('target'),
+              json.dumps(redirect, ensure_ascii=False))
+             for redirect in self.redirects.iter_redirects(workers=workers))
+        )
+
+    def sync_categories(self, workers: int = config.SHOPER_MAX_WORKERS) -> int:
+        print("ℹ️  Syncing categories...")
+        return self._replace_table(
+            'categories', ('category_id', 'data'),
+            ((category['category_id'], json.dumps(category, ensure_ascii=False))
+             for category in self.categories.iter_categories(workers=workers))
+        )
+
+    def sync_attributes(self, workers: int = config.SHOPER_MAX_WORKERS) -> int:
+        print("ℹ️  Syncing attributes...")
+        return self._replace_table(
+            'attributes', ('attribute_id', 'attribute_group_id', 'data'),
+            ((attribute['attribute_id'], attribute.get('attribute_group_id'), json.dumps(attribute, ensure_ascii=False))
+             for attribute in self.attributes.iter_attributes(workers=workers))
+        )
+
+    # Reads
+
+    def _fetch_one(self, query: str, *args) -> dict | None:
+        row = self.db.execute(query, args).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def _fetch_all(self, query: str, *args) -> list[dict]:
+        return [json.loads(row['data']) for row in self.db.execute(query, args)]
+
+    def get_product(self, product_id: int) -> dict | None:
+        return self._fetch_one('SELECT data FROM products WHERE product_id = ?', int(product_id))
+
+    def get_product_by_code(self, code: str) -> dict | None:
+        return self._fetch_one('SELECT data FROM products WHERE code = ?', code)
+
+    def get_product_by_ean(self, ean: str) -> dict | None:
+        return self._fetch_one('SELECT data FROM products WHERE ean = ?', ean)
+
+    def get_products_by_category(self, category_id: int) -> list[dict]:
+        """Products assigned to a category, either as the main category or an additional one."""
+        return self._fetch_all(
+            'SELECT p.data FROM product_categories pc JOIN products p ON p.product_id = pc.product_id '
+            'WHERE pc.category_id = ? ORDER BY p.product_id', int(category_id)
+        )
+
+    def iter_products(self):
+        """Stream every mirrored product without loading the table into memory."""
+        for row in self.db.execute('SELECT data FROM products ORDER BY product_id'):
+            yield json.loads(row['data'])
+
+    def get_special_offers_for_product(self, product_id: int) -> list[dict]:
+        return self._fetch_all('SELECT data FROM special_offers WHERE product_id = ?', int(product_id))
+
+    def get_redirects_by_route(self, route: str) -> list[dict]:
+        return self._fetch_all('SELECT data FROM redirects WHERE route = ?', route)
+
+    def get_redirects_by_target(self, target: str) -> list[dict]:
+        return self._fetch_all('SELECT data FROM redirects WHERE target = ?', target)
+
+    def get_category(self, category_id: int) -> dict | None:
+        return self._fetch_one('SELECT data FROM categories WHERE category_id = ?', int(category_id))
+
+    def get_attributes_by_group(self, attribute_group_id: int) -> list[dict]:
+        return self._fetch_all('SELECT data FROM attributes WHERE attribute_group_id = ?', int(attribute_group_id))
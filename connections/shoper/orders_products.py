@@ -1,6 +1,8 @@
-import config
+from .pagination import paginate
+import config, json
 from tqdm import tqdm
 from datetime import datetime
+from pathlib import Path
 
 
 class ShoperProductOrders:
@@ -10,6 +12,7 @@ class ShoperProductOrders:
         """
         self.client = client
         self.url = f'{self.client.site_url}/webapi/rest/order-products'
+        self.cursor_file = config.DATA_DIR / 'shoper_order_products_cursor.json'
 
     def get_latest_product_orders(self, pages_to_fetch=1):
         """Get latest product orders from Shoper.
@@ -62,3 +65,54 @@ class ShoperProductOrders:
             order_products.extend(response.json().get('list', []))
 
         return order_products
+
+    def get_last_seen_id(self) -> int | None:
+        """Highest order-product ID returned by get_new_product_orders, None before the first run."""
+        try:
+            with open(self.cursor_file, 'r', encoding='utf-8') as file:
+                return json.load(file)['last_id']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_last_seen_id(self, last_id: int):
+        temp_file = Path(f'{self.cursor_file}.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            json.dump({'last_id': last_id, 'updated_at': datetime.now().isoformat()}, file)
+        temp_file.replace(self.cursor_file)
+
+    def commit_cursor(self, order_products: list[dict]):
+        """Advance the cursor past order products returned by get_new_product_orders(save_cursor=False),
+        call it once they are synced so a failed sync downloads them again."""
+        if order_products:
+            self._save_last_seen_id(max(int(order_product['id']) for order_product in order_products))
+
+    def get_new_product_orders(self, save_cursor: bool = True) -> list[dict]:
+        """Get product orders added since the previous call.
+        Only rows with an ID above the stored cursor are requested, oldest first, so nothing
+        is missed or repeated when orders arrive during the download. When nothing changed
+        this costs a single request. The first run returns the newest page and starts the cursor there.
+        Usage:
+            order_products = orders.get_new_product_orders(save_cursor=False)
+            sync(order_products)
+            orders.commit_cursor(order_products)
+        Args:
+            save_cursor (bool): Advance the cursor right away. Pass False and call commit_cursor
+                after the rows are processed, so rows of a failed sync are returned again
+        Returns:
+            list: New order products, ordered by ID
+        """
+        last_id = self.get_last_seen_id()
+
+        if last_id is None:
+            print("ℹ️  No order-products cursor yet, downloading the newest page...")
+            order_products = list(paginate(self.client, self.url, params={'order': 'id desc'}, end_page=1))
+            order_products.reverse()
+        else:
+            print(f"ℹ️  Downloading product orders newer than {last_id}...")
+            order_products = list(paginate(self.client, self.url, params={'order': 'id asc'},
+                                           filters={'id': {'>': last_id}}))
+
+        if save_cursor:
+            self.commit_cursor(order_products)
+
+        return order_products
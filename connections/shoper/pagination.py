@@ -0,0 +1,131 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import config, json, threading
+from tqdm import tqdm
+from urllib.parse import quote
+
+
+def paginate(client, url: str, params: dict | None = None, filters: dict | None = None,
+             workers: int = 1, start_page: int = 1, end_page: int | None = None,
+             max_records: int | None = None, cache: bool = True, desc: str = 'Downloading pages'):
+    """Yield records from a paginated Shoper list endpoint, one page at a time.
+    Only the pages currently being downloaded are kept in memory, so a full sweep
+    runs in constant memory no matter how many records the resource holds.
+    Args:
+        client (ShoperAPIClient): Connected Shoper client
+        url (str): List endpoint url
+        params (dict): Extra query parameters, e.g. {'order': 'id desc'}
+        filters (dict): Shoper filters, encoded to JSON for the request
+        workers (int): Number of pages prefetched at the same time. With more than one
+            worker the next pages are downloaded by a thread pool sharing the client's rate limit.
+        start_page (int): First page to download
+        end_page (int): Last page to download (inclusive), defaults to the last available page
+        max_records (int): Stop after yielding this many records
+        cache (bool): If False, bypass the client's GET cache
+        desc (str): Progress bar description
+    Yields:
+        dict: Records in page order
+    Raises:
+        ShoperAPIError: The first error raised by any request. Queued pages are cancelled
+            and running workers stop before their next request.
+    """
+    params = {'limit': config.SHOPER_LIMIT, **(params or {})}
+    if filters:
+        params['filters'] = json.dumps(filters)
+
+    stop = threading.Event()
+
+    def fetch_page(page):
+        if stop.is_set():
+            return {}
+        return client._handle_request('GET', url, params={**params, 'page': page}, cache=cache).json()
+
+    data = fetch_page(start_page)
+    last_page = data.get('pages', 1) if end_page is None else min(end_page, data.get('pages', 1))
+    pages = iter(range(start_page + 1, last_page + 1))
+    remaining = max_records
+
+    def take(records):
+        nonlocal remaining
+        if remaining is not None:
+            records = records[:remaining]
+            remaining -= len(records)
+        return records
+
+    if workers <= 1:
+        yield from take(data.get('list', []))
+        for page in tqdm(pages, total=max(last_page - start_page, 0), desc=desc, unit=' page'):
+            if remaining == 0:
+                return
+            yield from take(fetch_page(page).get('list', []))
+        return
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    window = deque(executor.submit(fetch_page, page) for _, page in zip(range(workers), pages))
+
+    try:
+        yield from take(data.get('list', []))
+
+        with tqdm(total=max(last_page - start_page, 0), desc=desc, unit=' page') as progress:
+            while window and remaining != 0:
+                records = window.popleft().result().get('list', [])
+                progress.update()
+
+                next_page = next(pages, None)
+                if next_page is not None:
+                    window.append(executor.submit(fetch_page, next_page))
+
+                yield from take(records)
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def chunk_filter_values(field: str, values: list, max_length: int = config.SHOPER_MAX_FILTER_LENGTH) -> list[list]:
+    """Split values of an IN filter so that each encoded filter stays under max_length.
+    Chunks never hold more than SHOPER_LIMIT values, so one page answers a chunk of unique keys.
+    Args:
+        field (str): Filtered field, e.g. 'stock.code'
+        values (list): Values to look up
+        max_length (int): Max url-encoded length of the filters parameter
+    Returns:
+        list: Value chunks
+    """
+    chunks = []
+    chunk = []
+    length = len(quote(json.dumps({field: {'IN': []}})))
+
+    for value in values:
+        value_length = len(quote(json.dumps(value))) + len(quote(', '))
+        if chunk and (length + value_length > max_length or len(chunk) >= config.SHOPER_LIMIT):
+            chunks.append(chunk)
+            chunk = []
+            length = len(quote(json.dumps({field: {'IN': []}})))
+        chunk.append(value)
+        length += value_length
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+def paginate_in(client, url: str, field: str, values: list, workers: int = config.SHOPER_MAX_WORKERS,
+                desc: str = 'Downloading chunks') -> list[dict]:
+    """Download records whose `field` is one of `values`, the thread pool version of the async client's filter_in.
+    Values are chunked into IN filters with chunk_filter_values and the chunks are paginated concurrently.
+    Args:
+        client (ShoperAPIClient): Connected Shoper client
+        url (str): List endpoint url
+        field (str): Filtered field, e.g. 'stock.code'
+        values (list): Values to look up
+        workers (int): Number of chunks downloaded at the same time
+        desc (str): Progress bar description
+    Returns:
+        list: Records of every chunk, in chunk order
+    """
+    def fetch_chunk(chunk):
+        return list(paginate(client, url, filters={field: {'IN': chunk}}, desc=desc))
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        return [record for chunk in executor.map(fetch_chunk, chunk_filter_values(field, values)) for record in chunk]
@@ -1,4 +1,6 @@
-import config, json
+from .pagination import paginate, paginate_in
+from collections import defaultdict
+import config
 from utils.helpers.helper_functions import export_to_json
 
 
@@ -10,13 +12,17 @@ class ShoperPictures:
         self.client = client
         self.url = f'{self.client.site_url}/webapi/rest/product-images'
 
-    def create_product_picture(self, image_data: dict):
+    def create_product_picture(self, image_data: dict, bulk=None):
         """Update a new product image.
         Args:
             image_data (dict): Image data
+            bulk (ShoperBulk): If given, queue the request in this bulk batch instead of sending it
         Returns:
-            bool: True if successful
+            bool|ShoperBulkItem: True if successful, queued item if bulk is given
         """
+        if bulk is not None:
+            return bulk.add('POST', self.url, image_data)
+
         self.client._handle_request('POST', self.url, json=image_data)
         return True
     
@@ -28,19 +34,50 @@ class ShoperPictures:
         Returns:
             list: List of product images if successful.
         """
-        photo_filter = {
-            "filters": json.dumps({"product_id": product_id}),
-            "limit": config.SHOPER_LIMIT
-        }
-
-        data = self.client._handle_request('GET', self.url, params=photo_filter).json()
-        images = data.get('list', [])
+        images = list(paginate(self.client, self.url, filters={'product_id': product_id},
+                               desc='Downloading images'))
 
         if export:
             export_to_json(images, f'shoper/product_images/shoper_product_images_{product_id}.json')
 
         return images
 
+    def iter_pictures(self, **pagination):
+        """Stream product images from Shoper page by page.
+        Args:
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Yields:
+            dict: Product image data
+        """
+        yield from paginate(self.client, self.url, **pagination)
+
+    def get_pictures_for_products(self, product_ids: list[int] | None = None,
+                                  workers: int = config.SHOPER_MAX_WORKERS) -> dict[int, list]:
+        """Get images of many products at once.
+        Product IDs are packed into `product_id IN [...]` filters and each chunk is paginated,
+        so the cost is one call per page of images instead of one call per product.
+        Without product_ids the whole product-images listing is downloaded.
+        Args:
+            product_ids (list): Product ids, None for every product
+            workers (int): Number of requests sent at the same time
+        Returns:
+            dict: {product_id: [images]}, products without images map to an empty list
+        """
+        images = defaultdict(list)
+
+        if product_ids is None:
+            print("ℹ️  Downloading all product images...")
+            for image in self.iter_pictures(workers=workers):
+                images[int(image['product_id'])].append(image)
+            return dict(images)
+
+        product_ids = list(dict.fromkeys(int(product_id) for product_id in product_ids))
+        for image in paginate_in(self.client, self.url, 'product_id', product_ids, workers=workers,
+                                 desc='Downloading images'):
+            images[int(image['product_id'])].append(image)
+
+        return {product_id: images.get(product_id, []) for product_id in product_ids}
+
     def change_product_picture(self, photo_id: int, new_url: str) -> bool:
         """Changes a current image to a new one
         Args:
@@ -0,0 +1,97 @@
+from pathlib import Path
+import config, sqlite3, threading, time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS product_index (
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    indexed_at REAL NOT NULL,
+    PRIMARY KEY (kind, value)
+);
+CREATE INDEX IF NOT EXISTS idx_product_index_product ON product_index (product_id);
+"""
+
+
+class ShoperProductIndex:
+    def __init__(self, db_path: str | Path = config.DATA_DIR / 'shoper_product_index.sqlite',
+                 ttl: float = config.SHOPER_PRODUCT_INDEX_TTL):
+        """Persistent SKU -> product_id and EAN -> product_id lookup.
+        Entries older than `ttl` seconds are treated as missing, so a stale mapping is
+        looked up again instead of being trusted forever.
+        Args:
+            db_path (str|Path): SQLite database file
+            ttl (float): Seconds an entry stays valid
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    @staticmethod
+    def _entries(product: dict) -> list[tuple]:
+        product_id = int(product['product_id'])
+        stock = product.get('stock') or {}
+        entries = []
+
+        for kind, value in (('code', product.get('code') or stock.get('code')),
+                            ('ean', product.get('ean') or stock.get('ean'))):
+            if value:
+                entries.append((kind, str(value), product_id))
+
+        return entries
+
+    def get(self, code: str | None = None, ean: str | None = None) -> int | None:
+        """Get a product ID by SKU or EAN.
+        Returns:
+            int|None: Product ID, None if the value is not indexed or the entry expired
+        """
+        kind, value = ('code', code) if code is not None else ('ean', ean)
+
+        with self.lock:
+            row = self.db.execute(
+                'SELECT product_id, indexed_at FROM product_index WHERE kind = ? AND value = ?',
+                (kind, str(value))
+            ).fetchone()
+
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row[0]
+
+    def update(self, products) -> int:
+        """Index SKUs and EANs of many products, e.g. the result of a product sweep.
+        Returns:
+            int: Number of products indexed
+        """
+        now = time.time()
+        rows = []
+        count = 0
+
+        for product in products:
+            rows.extend((kind, value, product_id, now) for kind, value, product_id in self._entries(product))
+            count += 1
+
+        with self.lock, self.db:
+            self.db.executemany('INSERT OR REPLACE INTO product_index VALUES (?, ?, ?, ?)', rows)
+
+        return count
+
+    def add(self, product: dict):
+        self.update([product])
+
+    def invalidate(self, product_id: int | None = None, code: str | None = None, ean: str | None = None):
+        """Drop entries of a product (all of its SKUs and EANs) or of a single SKU/EAN."""
+        with self.lock, self.db:
+            if product_id is not None:
+                self.db.execute('DELETE FROM product_index WHERE product_id = ?', (int(product_id),))
+            if code is not None:
+                self.db.execute("DELETE FROM product_index WHERE kind = 'code' AND value = ?", (str(code),))
+            if ean is not None:
+                self.db.execute("DELETE FROM product_index WHERE kind = 'ean' AND value = ?", (str(ean),))
+
+    def clear(self):
+        with self.lock, self.db:
+            self.db.execute('DELETE FROM product_index')
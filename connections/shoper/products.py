@@ -1,6 +1,13 @@
 from .pictures import ShoperPictures
+from .pagination import paginate, paginate_in
+from .exceptions import ShoperAPIError
 import config, json
-from tqdm import tqdm
+from utils.helpers.helper_functions import export_to_ndjson
+
+
+def normalize_code(code) -> str:
+    """' sku-1 ' -> 'SKU-1', codes typed in a sheet rarely match the stored SKU exactly."""
+    return str(code).strip().casefold()
 
 
 class ShoperProducts:
@@ -38,6 +45,7 @@ class ShoperProducts:
                         'error': f'Product {identifier} doesn\'t exist'}
 
             product = product_list[0]
+            self.client.product_index.add(product)
             
         else:
             # Get product by product ID
@@ -60,6 +68,82 @@ class ShoperProducts:
 
         return product
 
+    def get_products_by_codes(self, codes: list[str], pictures: bool = False,
+                              workers: int = config.SHOPER_MAX_WORKERS) -> dict:
+        """Get many products by product code (SKU) with as few requests as possible.
+        Codes are packed into `stock.code IN [...]` filters, chunked so each url stays
+        under SHOPER_MAX_FILTER_LENGTH, and the chunks are downloaded concurrently.
+        Codes are matched ignoring case and surrounding whitespace, results are keyed by the codes as requested.
+        Args:
+            codes (list): Product codes (SKU)
+            pictures (bool): If True, load images of all found products in bulk into product['img']
+            workers (int): Number of chunks downloaded at the same time
+        Returns:
+            dict: {'products': {requested code: product}, 'missing': [requested codes not found]}
+        """
+        codes = list(dict.fromkeys(str(code) for code in codes))
+        lookup = list(dict.fromkeys(code.strip() for code in codes))
+
+        found = {}
+        for product in paginate_in(self.client, self.url, 'stock.code', lookup, workers=workers,
+                                   desc='Downloading codes'):
+            found[normalize_code(product.get('code') or product.get('stock', {}).get('code'))] = product
+
+        self.client.product_index.update(found.values())
+
+        if pictures and found:
+            images = self.pictures.get_pictures_for_products(
+                [product['product_id'] for product in found.values()], workers=workers)
+            for product in found.values():
+                product['img'] = images.get(int(product['product_id']), [])
+
+        return {
+            'products': {code: found[normalize_code(code)] for code in codes if normalize_code(code) in found},
+            'missing': [code for code in codes if normalize_code(code) not in found]
+        }
+
+    def get_product_id(self, identifier: str, use_code: bool = False) -> int | None:
+        """Turn a product code (SKU) into a product ID using the product index.
+        The API is only asked when the code is not indexed or its entry expired.
+        Args:
+            identifier (str): Product ID or product code (str)
+            use_code (bool): If True, identifier is a product code (SKU)
+        Returns:
+            int|None: Product ID, None if the product doesn't exist
+        """
+        if not use_code:
+            return identifier
+
+        product_id = self.client.product_index.get(code=identifier)
+        if product_id is not None:
+            return product_id
+
+        product = self.get_product_by_code(identifier, use_code=True)
+        return product.get('product_id')
+
+    def get_product(self, identifier: str, use_code: bool = False) -> dict:
+        """Get product data with a single request, for callers that need more than the product ID.
+        An indexed code is read by ID, otherwise the product found by the code lookup is returned
+        as is instead of being downloaded a second time.
+        Args:
+            identifier (str): Product ID or product code (str)
+            use_code (bool): If True, identifier is a product code (SKU)
+        Returns:
+            dict: Product data if successful, Error dict if the product doesn't exist
+        """
+        product_id = self.client.product_index.get(code=identifier) if use_code else identifier
+        if product_id is None:
+            return self.get_product_by_code(identifier, use_code=True)
+
+        try:
+            return self.get_product_by_code(product_id)
+        except ShoperAPIError as e:
+            if not (use_code and e.status_code == 404):
+                raise
+            # The indexed product ID is stale, look the code up instead
+            self.client.product_index.invalidate(code=identifier)
+            return self.get_product_by_code(identifier, use_code=True)
+
     def create_product(self, product_data: dict) -> int | dict:
         """Create a new product in Shoper
         Args:
@@ -96,6 +180,7 @@ class ShoperProducts:
             'DELETE',
             f'{self.url}/{product_id}'
         )
+        self.client.product_index.invalidate(product_id=product_id)
         
         if response.status_code != 200:
             error_description = response.json().get('error_description', 'Unknown error')
@@ -103,32 +188,53 @@ class ShoperProducts:
         
         return True
 
-    def update_product_by_code(self, identifier: str, use_code: bool = False, **parameters) -> bool | dict:
+    def update_product_by_code(self, identifier: str, use_code: bool = False, bulk=None, **parameters) -> bool | dict:
         """Update a product from Shoper. Returns True if successful, None if failed
         Args:
             identifier (str): Product id or product code
             use_code (bool): If True, use product code (SKU) instead of ID
+            bulk (ShoperBulk): If given, queue the update in this bulk batch instead of sending it
             parameters key=value: Parameters to update
         Returns:
-            True|dict: True if successful, Error dict if failed
+            True|dict|ShoperBulkItem: True if successful, Error dict if failed, queued item if bulk is given
         """
-        if use_code:
-            # Get product id by product code (SKU)
-            product = self.get_product_by_code(identifier, use_code=True)
-            product_id = product['product_id']
-        else:
-            product_id = identifier
+        product_id = self.get_product_id(identifier, use_code=use_code)
+        if product_id is None:
+            return {'success': False, 'error': f'Product {identifier} doesn\'t exist'}
 
         params = {}
 
         for key, value in parameters.items():
             if value is not None:
                 params[key] = value
-        response = self.client._handle_request(
-            'PUT',
-            f'{self.url}/{product_id}',
-            json=params
-        )
+
+        if bulk is not None:
+            return bulk.add('PUT', f'{self.url}/{product_id}', params)
+
+        try:
+            response = self.client._handle_request(
+                'PUT',
+                f'{self.url}/{product_id}',
+                json=params
+            )
+        except ShoperAPIError as e:
+            if not (use_code and e.status_code == 404):
+                raise
+            # The indexed product ID may be stale, look the code up again and retry once
+            self.client.product_index.invalidate(code=identifier)
+            fresh_product_id = self.get_product_id(identifier, use_code=True)
+            if fresh_product_id is None or fresh_product_id == product_id:
+                raise
+
+            product_id = fresh_product_id
+            response = self.client._handle_request(
+                'PUT',
+                f'{self.url}/{product_id}',
+                json=params
+            )
+
+        if 'code' in params or 'ean' in params:
+            self.client.product_index.invalidate(product_id=product_id)
 
         if response.status_code != 200:
             error_description = response.json().get('error_description', 'Unknown error')
@@ -136,44 +242,40 @@ class ShoperProducts:
         
         return True
 
-    def get_all_products(self) -> list | dict:
-        """Get all products from Shoper.
-        Returns a Data list if successful, Error dict if failed"""
-        products = []
-        params = {
-            'limit': config.SHOPER_LIMIT,
-            'page': 1
-        }
+    def iter_products(self, **pagination):
+        """Stream products from Shoper page by page.
+        Args:
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Yields:
+            dict: Product data
+        """
+        yield from paginate(self.client, self.url, **pagination)
 
+    def get_all_products(self, workers: int = 1, **pagination) -> list[dict]:
+        """Get all products from Shoper.
+        Args:
+            workers (int): Number of pages downloaded at the same time. With more than
+                one worker the next pages are prefetched by a thread pool sharing the client's rate limit.
+            pagination: Other options passed to paginate (filters, start_page, end_page, max_records)
+        Returns:
+            list: List of products if successful.
+        """
         print("ℹ️  Downloading all products...")
-        response = self.client._handle_request(
-            'GET',
-            self.url,
-            params=params
-        )
-        print(response)
-        if response.status_code != 200:
-            error_description = response.json().get('error_description', 'Unknown error')
-            return {'success': False, 'error': error_description}
-
-        data = response.json()
-        number_of_pages = data['pages']
-        products.extend(data.get('list', []))
-
-        for page in tqdm(range(2, number_of_pages + 1),
-                         desc="Downloading pages", unit=" page"):
-            
-            params['page'] = page
-            response = self.client._handle_request(
-                'GET',
-                self.url,
-                params=params
-            )
-
-            if response.status_code != 200:
-                error_description = response.json().get('error_description', 'Unknown error')
-                return {'success': False, 'error': error_description}
-
-            products.extend(response.json().get('list', []))
+        products = list(self.iter_products(workers=workers, **pagination))
+        self.client.product_index.update(products)
 
         return products
+
+    def export_all_products(self, workers: int = config.SHOPER_MAX_WORKERS,
+                            compression: str | None = config.EXPORT_COMPRESSION, **pagination):
+        """Stream all products from Shoper straight into an NDJSON export, in constant memory.
+        Args:
+            workers (int): Number of pages downloaded at the same time
+            compression (str): None, 'gzip' or 'zstd'
+            pagination: Other options passed to paginate (filters, start_page, end_page, max_records)
+        Returns:
+            Path: Path of the exported file
+        """
+        print("ℹ️  Exporting all products...")
+        return export_to_ndjson(self.iter_products(workers=workers, **pagination),
+                                'shoper/shoper_products.ndjson', compression)
@@ -0,0 +1,31 @@
+import config, time
+from utils.helpers.rate_limiter import TokenBucketRateLimiter
+
+
+class ShoperRateLimiter(TokenBucketRateLimiter):
+    def __init__(self, rate: float = config.SHOPER_REQUESTS_PER_SECOND,
+                 capacity: int = config.SHOPER_BUCKET_LIMIT,
+                 headroom: int = config.SHOPER_BUCKET_HEADROOM):
+        """Token bucket that mirrors Shoper's leaky bucket limit.
+        After every response the bucket is corrected with the X-Shop-Api-Calls / X-Shop-Api-Limit
+        headers, so calls made by other threads, clients or processes on the same shop are taken into account.
+        https://developers.shoper.pl/developers/api/limits
+        Args:
+            rate (float): Requests per second the bucket drains at
+            capacity (int): Bucket size, updated from X-Shop-Api-Limit
+            headroom (int): Calls kept free so the server-side bucket never overflows
+        """
+        super().__init__(rate, capacity, headroom)
+
+    def update_from_headers(self, headers):
+        """Correct the bucket with the call counters Shoper sends on every response."""
+        try:
+            calls = int(headers['X-Shop-Api-Calls'])
+            limit = int(headers['X-Shop-Api-Limit'])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        with self.lock:
+            self._refill(time.monotonic())
+            self.capacity = limit
+            self.tokens = min(self.tokens, limit - self.headroom - calls)
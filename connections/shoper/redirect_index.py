@@ -0,0 +1,76 @@
+import threading
+
+
+class ShoperRedirectIndex:
+    def __init__(self, redirects=()):
+        """In-memory redirect lookup by id, route and target.
+        Routes are unique in Shoper, so route lookups return a single redirect,
+        a target can be shared by many redirects (e.g. every outlet redirect points to /outlet).
+        Args:
+            redirects (iterable): Redirects as returned by the API
+        """
+        self.lock = threading.Lock()
+        self.by_id = {}
+        self.by_route = {}
+        self.by_target = {}
+        self.update(redirects)
+
+    @staticmethod
+    def normalize_route(route: str) -> str:
+        """'/outlet-abc/' and 'outlet-abc' are the same route."""
+        return str(route).strip().strip('/')
+
+    def add(self, redirect: dict):
+        """Index one redirect, a redirect queued in a bulk batch may have no redirect_id yet."""
+        with self.lock:
+            self._add(redirect)
+
+    def _add(self, redirect: dict):
+        route = self.normalize_route(redirect['route'])
+        previous = self.by_route.get(route)
+        if previous is not None:
+            self._remove(previous)
+
+        self.by_route[route] = redirect
+        self.by_target.setdefault(redirect.get('target'), {})[route] = redirect
+        if redirect.get('redirect_id') is not None:
+            self.by_id[int(redirect['redirect_id'])] = redirect
+
+    def update(self, redirects):
+        with self.lock:
+            for redirect in redirects:
+                self._add(redirect)
+
+    def remove(self, redirect_id: int | None = None, route: str | None = None) -> dict | None:
+        """Drop a redirect by id or route.
+        Returns:
+            dict|None: Removed redirect, None if it wasn't indexed
+        """
+        with self.lock:
+            redirect = self.by_id.get(int(redirect_id)) if redirect_id is not None \
+                else self.by_route.get(self.normalize_route(route))
+            if redirect is not None:
+                self._remove(redirect)
+            return redirect
+
+    def _remove(self, redirect: dict):
+        route = self.normalize_route(redirect['route'])
+        self.by_route.pop(route, None)
+        target_routes = self.by_target.get(redirect.get('target'), {})
+        target_routes.pop(route, None)
+        if not target_routes:
+            self.by_target.pop(redirect.get('target'), None)
+        if redirect.get('redirect_id') is not None:
+            self.by_id.pop(int(redirect['redirect_id']), None)
+
+    def get_by_route(self, route: str) -> dict | None:
+        return self.by_route.get(self.normalize_route(route))
+
+    def get_by_target(self, target: str) -> list[dict]:
+        return list(self.by_target.get(target, {}).values())
+
+    def __contains__(self, route: str) -> bool:
+        return self.normalize_route(route) in self.by_route
+
+    def __len__(self) -> int:
+        return len(self.by_route)
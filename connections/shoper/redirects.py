@@ -1,6 +1,7 @@
+from .pagination import paginate
+from .redirect_index import ShoperRedirectIndex
+from utils.helpers.helper_functions import export_to_ndjson
 import config
-from tqdm import tqdm
-from utils.helpers.helper_functions import export_to_json
 
 
 class ShoperRedirects:
@@ -10,59 +11,199 @@ class ShoperRedirects:
         """
         self.client = client
         self.url = f'{self.client.site_url}/webapi/rest/redirects'
+        self.index = None
+        # Bulk items of redirects created while the index is loaded, by route, until their batch is sent
+        self.pending = {}
 
-    def create_redirect(self, redirect_data: dict) -> int:
+    def load_index(self, workers: int = config.SHOPER_MAX_WORKERS) -> ShoperRedirectIndex:
+        """Download every redirect once into an in-memory index by route and target.
+        While the index is loaded, create_redirect and remove_redirect keep it current.
+        Args:
+            workers (int): Number of pages downloaded at the same time
+        Returns:
+            ShoperRedirectIndex: The loaded index
+        """
+        self.index = ShoperRedirectIndex(self.iter_redirects(workers=workers))
+        return self.index
+
+    def redirect_exists(self, route: str) -> bool:
+        """Check if a route is already redirected, the index is loaded on first use."""
+        if self.index is None:
+            self.load_index()
+        return route in self.index
+
+    def create_redirect(self, redirect_data: dict, bulk=None) -> int:
         """Create a redirect in Shoper.
+        While the index is loaded, an existing redirect of the route is reused when it already points
+        to the target and moved to the target otherwise.
         Args:
             redirect_data (dict): Data about the redirect:
                 route: string
                 target: string
+            bulk (ShoperBulk): If given, queue the request in this bulk batch instead of sending it
         Returns:
-            int: Redirect id if succesful
+            int|ShoperBulkItem: Redirect id if succesful, queued item if bulk is given
+                (or the item already queued for the same route and target)
+        Raises:
+            RuntimeError: If the route is queued in a bulk batch with another target
         """
         params = redirect_data
         params['type'] = 0
+
+        if self.index is not None:
+            existing = self.index.get_by_route(params['route'])
+            if existing is not None and existing.get('redirect_id') is None:
+                # Queued in a bulk batch that hasn't been sent yet
+                item = self.pending.get(self.index.normalize_route(params['route']))
+                if existing.get('target') != params['target']:
+                    raise RuntimeError(f"Redirect for {params['route']} is already queued to {existing.get('target')}")
+                print(f"ℹ️  Redirect for {params['route']} is already queued")
+                return item
+            if existing is not None and existing.get('target') == params['target']:
+                print(f"ℹ️  Redirect for {params['route']} already exists")
+                return existing['redirect_id']
+            if existing is not None:
+                print(f"ℹ️  Redirect for {params['route']} points to {existing.get('target')}, "
+                      f"moving it to {params['target']}")
+                return self._update_target(existing, params['target'], bulk)
+
+        if bulk is not None:
+            if self.index is None:
+                return bulk.add('POST', self.url, params)
+
+            # Indexed right away so the same route isn't queued twice, the id is filled in once the batch is sent
+            pending = dict(params)
+            self.index.add(pending)
+            item = bulk.add('POST', self.url, params, on_done=lambda item: self._index_created(pending, item))
+            if not item.done:
+                self.pending[self.index.normalize_route(params['route'])] = item
+            return item
+
         redirect_id = self.client._handle_request('POST', self.url, json=params).json()
 
+        if self.index is not None:
+            self.index.add({**params, 'redirect_id': redirect_id})
+
         return redirect_id
-    
-    def get_all_redirects(self, export: bool = True) -> list:
+
+    def _update_target(self, redirect: dict, target: str, bulk=None):
+        """Point an indexed redirect to another target, the index follows once the update succeeded."""
+        url = f"{self.url}/{redirect['redirect_id']}"
+        updated = {**redirect, 'target': target}
+
+        if bulk is not None:
+            return bulk.add('PUT', url, {'target': target},
+                            on_done=lambda item: self.index.add(updated) if item.success else None)
+
+        self.client._handle_request('PUT', url, json={'target': target})
+        self.index.add(updated)
+        return redirect['redirect_id']
+
+    def _index_created(self, redirect: dict, item):
+        self.pending.pop(self.index.normalize_route(redirect['route']), None)
+        if item.success:
+            self.index.add({**redirect, 'redirect_id': item.result()})
+        elif self.index.get_by_route(redirect['route']) is redirect:
+            self.index.remove(route=redirect['route'])
+
+    def _index_removed(self, redirect_id: int, item):
+        if item.success:
+            self.index.remove(redirect_id=redirect_id)
+
+    def iter_redirects(self, **pagination):
+        """Stream redirects from Shoper page by page.
+        Args:
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Yields:
+            dict: Redirect data
+        """
+        yield from paginate(self.client, self.url, **pagination)
+
+    def get_all_redirects(self, export: bool = True, **pagination) -> list[dict]:
         """Get all redirects from Shoper.
         Args:
-            export (bool): If True, export the redirects to a JSON file.
+            export (bool): If True, export the redirects to an NDJSON file.
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
         Returns:
-            list: List of redirects if successful
+            list: List of redirects if successful.
         """
-        redirects = []
-        params = {
-            'limit': config.SHOPER_LIMIT,
-            'page': 1
-        }
-
         print("ℹ️  Downloading all redirects...")
-        data = self.client._handle_request('GET', self.url, params=params).json()
-        number_of_pages = data.get('pages', 1)
-        redirects.extend(data.get('list', []))
-
-        for page in tqdm(range(2, number_of_pages + 1),
-                            desc="Downloading pages", unit=" page"):
-            
-            params['page'] = page
-            data = self.client._handle_request('GET', self.url, params=params).json()
-            redirects.extend(data.get('list', []))
+        redirects = list(self.iter_redirects(**pagination))
 
         if export:
-            export_to_json(redirects, 'shoper/shoper_redirects.json')
+            export_to_ndjson(redirects, 'shoper/shoper_redirects.ndjson')
 
         return redirects
 
-    def remove_redirect(self, identifier: str | int) -> bool:
+    def remove_redirect(self, identifier: str | int, bulk=None) -> bool:
         """Remove a redirect in Shoper.
         Args:
             identifier (str|int): Redirect id
+            bulk (ShoperBulk): If given, queue the request in this bulk batch instead of sending it
         Returns:
-            True|dict: True if succesful, Error dict if failed
+            True|dict|ShoperBulkItem: True if succesful, Error dict if failed, queued item if bulk is given
         """
+        if bulk is not None:
+            on_done = (lambda item: self._index_removed(identifier, item)) if self.index is not None else None
+            return bulk.add('DELETE', f'{self.url}/{identifier}', on_done=on_done)
+
         self.client._handle_request('DELETE', f'{self.url}/{identifier}')
 
+        if self.index is not None:
+            self.index.remove(redirect_id=identifier)
+
         return True
+
+    def remove_redirects(self, redirect_ids: list[int]) -> dict:
+        """Remove many redirects with bulk requests.
+        Args:
+            redirect_ids (list): Redirect ids
+        Returns:
+            dict: {redirect_id: ShoperAPIError} of failed removals
+        """
+        with self.client.bulk() as bulk:
+            items = {redirect_id: self.remove_redirect(redirect_id, bulk=bulk) for redirect_id in redirect_ids}
+
+        return {redirect_id: item._error for redirect_id, item in items.items() if not item.success}
+
+    def remove_expired_redirects(self, routes: list[str] | None = None, is_expired=None,
+                                 target: str = config.REDIRECT_TARGET_OUTLET_URL,
+                                 dry_run: bool = False) -> tuple[list[dict], list[dict]]:
+        """Remove redirects pointing to target that are no longer needed, in bulk.
+        Shoper doesn't store when a redirect was created, so expiry is decided by the caller:
+        either a list of routes (e.g. outlet products sold more than OUTLET_REDIRECT_DAYS_TO_BE_REMOVED
+        days ago) or a predicate called with every redirect of the target.
+        Args:
+            routes (list): Routes to remove
+            is_expired (callable): Function redirect -> bool, used when routes is not given
+            target (str): Only redirects to this target are removed
+            dry_run (bool): Only return the redirects that would be removed
+        Returns:
+            tuple: (removed redirects, redirects that could not be removed),
+                with dry_run the first list holds the redirects that would be removed
+        """
+        if self.index is None:
+            self.load_index()
+
+        if routes is not None:
+            expired = [redirect for redirect in map(self.index.get_by_route, routes)
+                       if redirect is not None and redirect.get('target') == target]
+        elif is_expired is not None:
+            expired = [redirect for redirect in self.index.get_by_target(target) if is_expired(redirect)]
+        else:
+            raise ValueError('Pass routes or is_expired')
+
+        expired = [redirect for redirect in expired if redirect.get('redirect_id') is not None]
+        print(f"ℹ️  {len(expired)} expired redirects to {target}")
+
+        if dry_run or not expired:
+            return expired, []
+
+        errors = self.remove_redirects([redirect['redirect_id'] for redirect in expired])
+        removed = [redirect for redirect in expired if redirect['redirect_id'] not in errors]
+        failed = [{**redirect, 'error': str(errors[redirect['redirect_id']])}
+                  for redirect in expired if redirect['redirect_id'] in errors]
+        if failed:
+            print(f"❌ {len(failed)} redirects could not be removed")
+
+        return removed, failed
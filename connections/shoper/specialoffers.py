@@ -1,8 +1,8 @@
 from .products import ShoperProducts
-import config
+from .pagination import paginate
 from datetime import datetime
-from tqdm import tqdm
-from utils.helpers.helper_functions import export_to_json
+import config
+from utils.helpers.helper_functions import export_to_ndjson
 
 
 class ShoperSpecialOffers:
@@ -15,26 +15,31 @@ class ShoperSpecialOffers:
         self.url = f'{self.client.site_url}/webapi/rest/specialoffers'
         self.TODAY = datetime.today().strftime('%Y-%m-%d')
 
-    def create_special_offer(self, discount_data: dict) -> int:
+    def create_special_offer(self, discount_data: dict, bulk=None) -> int:
         """Create a special offer for in Shoper.
         Args:
             discount_data (dict): Data about the discount:
                 product_id: integer,
                 discount: float,
                 discount_type: integer, (2 - fixed, 3 - percentage),
-                date_to: dd-mm-YYYY
+                date_to: dd-mm-YYYY,
+                date_from (optional): dd-mm-YYYY, today by default
+            bulk (ShoperBulk): If given, queue the request in this bulk batch instead of sending it
 
         Returns:
-            int: Special offer ID if successful.
+            int|ShoperBulkItem: Special offer ID if successful, queued item if bulk is given.
         """
         params = {
             'product_id': discount_data['product_id'],
             'discount': discount_data['discount'],
             'discount_type': discount_data['discount_type'],
-            'date_from': self.TODAY,
+            'date_from': discount_data.get('date_from') or self.TODAY,
             'date_to': discount_data['date_to'],
         }
 
+        if bulk is not None:
+            return bulk.add('POST', self.url, params)
+
         response = self.client._handle_request(
             'POST',
             self.url,
@@ -43,46 +48,186 @@ class ShoperSpecialOffers:
         
         return response.json()
 
-    def get_all_special_offers(self, export: bool = True) -> list[dict]:
+    def iter_special_offers(self, **pagination):
+        """Stream special offers from Shoper page by page.
+        Args:
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
+        Yields:
+            dict: Special offer data
+        """
+        yield from paginate(self.client, self.url, **pagination)
+
+    def get_all_special_offers(self, export: bool = True, **pagination) -> list[dict]:
         """Get all special offers from Shoper.
         Args:
-            export (bool): If True, export the special offers to a JSON file.
+            export (bool): If True, export the special offers to an NDJSON file.
+            pagination: Options passed to paginate (filters, workers, start_page, end_page, max_records)
         Returns:
             list: List of special offers if successful.
         """
-        special_offers = []
-        params = {
-            'limit': config.SHOPER_LIMIT,
-            'page': 1
-        }
-
         print("ℹ️  Downloading all special offers...")
-        data = self.client._handle_request('GET', self.url, params=params).json()
-        number_of_pages = data.get('pages', 1)
-        special_offers.extend(data.get('list', []))
-
-        for page in tqdm(range(2, number_of_pages + 1),
-                        desc="Downloading pages", unit=" page"):
-            
-            params['page'] = page
-            data = self.client._handle_request('GET', self.url, params=params).json()
-            special_offers.extend(data.get('list', []))
+        special_offers = list(self.iter_special_offers(**pagination))
 
         if export:
-            export_to_json(special_offers, 'shoper/shoper_special_offers.json')
+            export_to_ndjson(special_offers, 'shoper/shoper_special_offers.ndjson')
 
         return special_offers
-    
-    def remove_special_offer_from_product(self, identifier: str | int, use_code: bool = False) -> bool:
+
+    def remove_special_offer_from_product(self, identifier: str | int, use_code: bool = False) -> bool | dict:
         """Remove a special offer from Shoper.
         Args:
             identifier (str): Product ID or code (SKU).
             use_code (bool): Use product code (SKU) instead of product ID.
         Returns:
-            True: True if successful.
+            True|dict: True if successful, Error dict if the product doesn't exist or has no special offer.
         """
-        product = self.products.get_product_by_code(identifier, use_code=use_code)
-        promo_id = product.get('special_offer', {}).get('promo_id')
-        
+        # One read whether or not the code is indexed, then the delete
+        product = self.products.get_product(identifier, use_code=use_code)
+        if product.get('product_id') is None:
+            return {'success': False, 'error': f'Product {identifier} doesn\'t exist'}
+
+        promo_id = (product.get('special_offer') or {}).get('promo_id')
+        if promo_id is None:
+            return {'success': False, 'error': f'Product {identifier} has no special offer'}
+
         self.client._handle_request('DELETE', f'{self.url}/{promo_id}')
         return True
+
+    @staticmethod
+    def _normalize_date(value) -> str | None:
+        """'2025-06-30 00:00:00', '2025-06-30' and '30-06-2025' -> '2025-06-30'"""
+        if not value:
+            return None
+        value = str(value).strip()
+        for date_format in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%d-%m-%Y'):
+            try:
+                return datetime.strptime(value, date_format).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        return value
+
+    def _offer_changes(self, current: dict, desired: dict) -> dict:
+        """Fields of desired that differ from the current offer, empty if nothing changed."""
+        changes = {}
+        if float(current.get('discount') or 0) != float(desired['discount']):
+            changes['discount'] = desired['discount']
+        if int(current.get('discount_type') or 0) != int(desired['discount_type']):
+            changes['discount_type'] = desired['discount_type']
+        if self._normalize_date(current.get('date_to')) != self._normalize_date(desired['date_to']):
+            changes['date_to'] = desired['date_to']
+        if desired.get('date_from') and \
+                self._normalize_date(current.get('date_from')) != self._normalize_date(desired['date_from']):
+            changes['date_from'] = desired['date_from']
+        return changes
+
+    def _resolve_product_ids(self, discounts: list[dict], use_code: bool) -> tuple[dict, list]:
+        """Map desired discounts to product IDs, codes go through the product index and one IN query.
+        Returns:
+            tuple: ({product_id: discount_data}, [codes not found])
+        """
+        if not use_code:
+            return {int(discount['product_id']): discount for discount in discounts}, []
+
+        desired, unresolved = {}, {}
+        for discount in discounts:
+            product_id = self.client.product_index.get(code=discount['code'])
+            if product_id is not None:
+                desired[int(product_id)] = discount
+            else:
+                unresolved[str(discount['code'])] = discount
+
+        missing = []
+        if unresolved:
+            found = self.products.get_products_by_codes(list(unresolved))
+            for code, product in found['products'].items():
+                desired[int(product['product_id'])] = unresolved[code]
+            missing = found['missing']
+
+        return desired, missing
+
+    def plan_special_offers(self, discounts: list[dict], use_code: bool = False, remove_missing: bool = False,
+                            workers: int = config.SHOPER_MAX_WORKERS) -> dict:
+        """Compare the desired discounts with the special offers in Shoper.
+        Existing offers are downloaded once, every product is then matched in memory.
+        Args:
+            discounts (list): Desired discounts, each with product_id (or code if use_code),
+                discount, discount_type, date_to and optionally date_from
+            use_code (bool): Discounts are identified by product code (SKU) instead of product ID
+            remove_missing (bool): Also delete offers of products that are not in discounts
+            workers (int): Number of pages of special offers downloaded at the same time
+        Returns:
+            dict: {'create': [offer data], 'update': [(promo_id, changed fields)], 'delete': [promo_id],
+                   'unchanged': int, 'missing': [codes not found]}
+        """
+        desired, missing = self._resolve_product_ids(discounts, use_code)
+
+        current = {}
+        duplicates = []
+        for offer in self.get_all_special_offers(export=False, workers=workers):
+            product_id = int(offer['product_id'])
+            if product_id in current:
+                # Shoper allows one offer per product, extra ones are leftovers
+                duplicates.append((product_id, int(offer['promo_id'])))
+            else:
+                current[product_id] = offer
+
+        # Products outside discounts are only touched with remove_missing, their duplicates included
+        plan = {'create': [], 'update': [], 'unchanged': 0, 'missing': missing,
+                'delete': [promo_id for product_id, promo_id in duplicates
+                           if remove_missing or product_id in desired]}
+
+        for product_id, discount in desired.items():
+            offer = current.get(product_id)
+            if offer is None:
+                plan['create'].append({**discount, 'product_id': product_id})
+                continue
+
+            changes = self._offer_changes(offer, discount)
+            if changes:
+                plan['update'].append((int(offer['promo_id']), changes))
+            else:
+                plan['unchanged'] += 1
+
+        if remove_missing:
+            plan['delete'].extend(int(offer['promo_id']) for product_id, offer in current.items()
+                                  if product_id not in desired)
+
+        return plan
+
+    def reconcile_special_offers(self, discounts: list[dict], use_code: bool = False, remove_missing: bool = False,
+                                 dry_run: bool = False, workers: int = config.SHOPER_MAX_WORKERS) -> dict:
+        """Bring Shoper special offers in line with the desired discounts using the fewest writes.
+        Offers that already match are left alone, changed ones are updated in place and
+        the rest is created or deleted, all sent in bulk batches. Running it twice with
+        the same discounts makes no writes the second time.
+        Args:
+            discounts (list): Desired discounts, see plan_special_offers
+            use_code (bool): Discounts are identified by product code (SKU) instead of product ID
+            remove_missing (bool): Also delete offers of products that are not in discounts
+            dry_run (bool): Only compute the plan, don't change anything
+            workers (int): Number of pages of special offers downloaded at the same time
+        Returns:
+            dict: The plan (see plan_special_offers) with 'errors' - list of failed writes
+        """
+        plan = self.plan_special_offers(discounts, use_code=use_code, remove_missing=remove_missing, workers=workers)
+        print(f"ℹ️  Special offers: {len(plan['create'])} to create, {len(plan['update'])} to update, "
+              f"{len(plan['delete'])} to delete, {plan['unchanged']} unchanged")
+
+        plan['errors'] = []
+        if dry_run or not (plan['create'] or plan['update'] or plan['delete']):
+            return plan
+
+        with self.client.bulk() as bulk:
+            # Deletes go first, so a product never holds two offers at once
+            for promo_id in plan['delete']:
+                bulk.add('DELETE', f'{self.url}/{promo_id}')
+            for promo_id, changes in plan['update']:
+                bulk.add('PUT', f'{self.url}/{promo_id}', changes)
+            for discount_data in plan['create']:
+                self.create_special_offer(discount_data, bulk=bulk)
+
+        plan['errors'] = bulk.errors
+        if plan['errors']:
+            print(f"❌ {len(plan['errors'])} special offer changes failed")
+
+        return plan
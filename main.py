@@ -11,11 +11,15 @@ from connections.shoper import (ShoperAPIClient,
                                 ShoperGauges)
 
 from connections.allegro import AllegroAPIClient, AllegroOffers
+from utils.helpers.metrics import request_metrics
 from pprint import pprint
 import pandas as pd
+import atexit
 import json
 import config
 
+atexit.register(request_metrics.export)
+
 
 client = ShoperAPIClient()
 client.connect()
@@ -0,0 +1,2 @@
+from .outlet_pipeline import OutletListingPipeline
+from .description_rewriter import DescriptionRewriter
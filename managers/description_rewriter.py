@@ -0,0 +1,108 @@
+from connections.shoper import ShoperProducts
+import re
+
+PLACEHOLDER = '[SKU_OUTLET_CODE]'
+
+
+class DescriptionRewriter:
+    def __init__(self, rules: dict[str, str]):
+        """Rewrite many HTML snippets in product descriptions in a single pass.
+        All snippets are compiled into one regex of named alternatives (longest first),
+        so every description is scanned once no matter how many rules there are.
+        [SKU_OUTLET_CODE] in a snippet matches any code, the matched code is put back
+        in place of [SKU_OUTLET_CODE] in the replacement.
+        Usage:
+            # Remove the Bewood and Grizz notes
+            DescriptionRewriter({snippet: '' for snippet in config.formulas_to_remove.values()})
+            # Swap an old damage description for the current one
+            DescriptionRewriter({old_usz_snippet: config.damage_types_long['USZ']})
+        Args:
+            rules (dict): {snippet to find: replacement}, an empty replacement removes the snippet
+        """
+        self.rules = []
+        alternatives = []
+
+        for i, (snippet, replacement) in enumerate(sorted(rules.items(), key=lambda rule: -len(rule[0]))):
+            # The first placeholder captures the code, later ones must repeat the same code
+            first, *rest = re.escape(snippet).split(re.escape(PLACEHOLDER))
+            pattern = first
+            for n, part in enumerate(rest):
+                pattern += (f'(?P<code{i}>[^<]*?)' if n == 0 else f'(?P=code{i})') + part
+            alternatives.append(f'(?P<rule{i}>{pattern})')
+            self.rules.append((snippet, replacement))
+
+        self.pattern = re.compile('|'.join(alternatives)) if alternatives else None
+
+    def _replace(self, match: re.Match) -> str:
+        i = int(match.lastgroup.removeprefix('rule'))
+        replacement = self.rules[i][1]
+        if PLACEHOLDER in replacement:
+            replacement = replacement.replace(PLACEHOLDER, match.group(f'code{i}') or '')
+        return replacement
+
+    def rewrite(self, text: str) -> tuple[str, int]:
+        """Apply every rule to a text.
+        Returns:
+            tuple: (new text, number of replaced snippets)
+        """
+        if not text or self.pattern is None:
+            return text, 0
+        return self.pattern.subn(self._replace, text)
+
+    def plan(self, products) -> list[dict]:
+        """Find products whose description changes.
+        Args:
+            products (iterable): Products, e.g. ShoperCatalogMirror.iter_products()
+        Returns:
+            list: [{'product_id', 'code', 'description', 'replacements'}] of changed products only
+        """
+        changes = []
+        for product in products:
+            description = (product.get('translations') or {}).get('pl_PL', {}).get('description')
+            new_description, count = self.rewrite(description)
+            if count and new_description != description:
+                changes.append({
+                    'product_id': int(product['product_id']),
+                    'code': product.get('code') or (product.get('stock') or {}).get('code'),
+                    'description': new_description,
+                    'replacements': count,
+                })
+        return changes
+
+    def apply(self, client, mirror, dry_run: bool = False) -> dict:
+        """Rewrite descriptions across the whole catalog.
+        Affected products are found in the local mirror (sync it first), only changed
+        descriptions are sent, in bulk batches, and the mirror is updated with them.
+        Args:
+            client (ShoperAPIClient): Connected Shoper client
+            mirror (ShoperCatalogMirror): Synced local catalog
+            dry_run (bool): Only return the changes, don't send anything
+        Returns:
+            dict: {'changes': [see plan], 'errors': [ShoperAPIError]}
+        """
+        print("ℹ️  Searching descriptions to rewrite...")
+        changes = self.plan(mirror.iter_products())
+        print(f"ℹ️  {len(changes)} descriptions to rewrite")
+
+        if dry_run or not changes:
+            return {'changes': changes, 'errors': []}
+
+        products = ShoperProducts(client)
+        with client.bulk() as bulk:
+            items = [(change, products.update_product_by_code(
+                change['product_id'], translations={'pl_PL': {'description': change['description']}}, bulk=bulk))
+                for change in changes]
+
+        updated = []
+        for change, item in items:
+            if item.success:
+                product = mirror.get_product(change['product_id'])
+                product.setdefault('translations', {}).setdefault('pl_PL', {})['description'] = change['description']
+                updated.append(product)
+        mirror.store_products(updated)
+
+        if bulk.errors:
+            print(f"❌ {len(bulk.errors)} descriptions could not be updated")
+
+        return {'changes': changes, 'errors': bulk.errors}
+
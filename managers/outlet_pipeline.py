@@ -0,0 +1,202 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from connections.shoper import ShoperProducts, ShoperPictures, ShoperRedirects, ShoperAPIError
+from datetime import datetime
+from pathlib import Path
+from tqdm import tqdm
+import config, copy, json, requests, threading
+
+
+class OutletListingPipeline:
+    # Every outlet row goes through these stages in order, finished stages are stored in the checkpoint
+    STAGES = ('product', 'pictures', 'details', 'redirect')
+
+    def __init__(self, client, workers: int = config.SHOPER_MAX_WORKERS,
+                 checkpoint_file: str | Path = config.DATA_DIR / 'outlet_pipeline_checkpoint.json'):
+        """List many outlet products at once.
+        Every row is a dict with:
+            code: Code (SKU) of the original product
+            outlet_code: Code (SKU) of the new outlet product
+            damage_type: One of OUTLET_VALID_DAMAGE_TYPES
+            price, stock (optional): Price and stock of the outlet product, the original price and 1 by default
+        Rows run concurrently, each one creating the product, copying pictures, setting OUTLET_ATTRIBUTE
+        with the damage description and adding a redirect. Progress of every row is saved after each
+        stage, so a run that stopped halfway is resumed without creating anything twice.
+        Args:
+            client (ShoperAPIClient): Connected Shoper client, its rate limit is shared by all workers
+            workers (int): Rows processed at the same time
+            checkpoint_file (str|Path): JSON file with the progress of every outlet code
+        """
+        self.client = client
+        self.products = ShoperProducts(client)
+        self.pictures = ShoperPictures(client)
+        self.redirects = ShoperRedirects(client)
+        self.workers = workers
+        self.checkpoint_file = Path(checkpoint_file)
+        self.lock = threading.Lock()
+        self.checkpoint = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> dict:
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_checkpoint(self):
+        self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = Path(f'{self.checkpoint_file}.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            json.dump(self.checkpoint, file, indent=4, ensure_ascii=False)
+        temp_file.replace(self.checkpoint_file)
+
+    def _mark(self, outlet_code: str, stage: str | None = None, **data):
+        """Record a finished stage (and e.g. the new product_id) of a row and save the checkpoint."""
+        with self.lock:
+            entry = self.checkpoint.setdefault(outlet_code, {'done': [], 'product_id': None, 'error': None})
+            if stage is not None and stage not in entry['done']:
+                entry['done'].append(stage)
+            entry.update(data, updated_at=datetime.now().isoformat(timespec='seconds'))
+            self._save_checkpoint()
+
+    def is_done(self, outlet_code: str) -> bool:
+        return set(self.STAGES) <= set(self.checkpoint.get(outlet_code, {}).get('done', []))
+
+    def reset(self):
+        """Forget all progress, e.g. after every row of the sheet was listed."""
+        with self.lock:
+            self.checkpoint = {}
+            self.checkpoint_file.unlink(missing_ok=True)
+
+    def build_product(self, row: dict, original: dict) -> dict:
+        """Data of the new outlet product, copied from the original product."""
+        translation = copy.deepcopy((original.get('translations') or {}).get('pl_PL', {}))
+        translation['name'] = f"{translation.get('name', row['code'])} - Outlet"
+        translation.pop('permalink', None)
+        translation.pop('seo_url', None)
+
+        stock = original.get('stock') or {}
+        return {
+            'category_id': original.get('category_id'),
+            'producer_id': original.get('producer_id'),
+            'code': row['outlet_code'],
+            'ean': original.get('ean'),
+            'stock': {
+                'price': row.get('price') or stock.get('price'),
+                'stock': row.get('stock', 1),
+                'weight': stock.get('weight'),
+            },
+            'translations': {'pl_PL': translation},
+        }
+
+    def build_description(self, row: dict, original: dict) -> str:
+        """Damage description from damage_types_long put above the original description."""
+        damage_info = config.damage_types_long[row['damage_type']].replace('[SKU_OUTLET_CODE]', row['code'])
+        description = (original.get('translations') or {}).get('pl_PL', {}).get('description') or ''
+        return damage_info + description
+
+    def redirect_route(self, row: dict) -> str:
+        return f"/outlet-{row['outlet_code'].lower()}"
+
+    def _stage_product(self, row: dict, original: dict, entry: dict) -> dict:
+        # The product may have been created right before a crash, adopt it instead of creating a duplicate
+        product_id = self.products.get_product_id(row['outlet_code'], use_code=True)
+        if product_id is None:
+            product_id = self.products.create_product(self.build_product(row, original))
+            if isinstance(product_id, dict):
+                raise RuntimeError(product_id.get('error'))
+            self.client.product_index.add({'product_id': product_id, 'code': row['outlet_code']})
+        return {'product_id': product_id}
+
+    def _stage_pictures(self, row: dict, original: dict, entry: dict) -> dict:
+        existing = self.pictures.get_product_pictures(entry['product_id'])
+        images = original.get('img', [])[len(existing):]
+
+        with self.client.bulk() as bulk:
+            for image in images:
+                self.pictures.create_product_picture({
+                    'product_id': entry['product_id'],
+                    'url': f"{self.client.site_url}/userdata/public/gfx/{image['gfx_id']}/"
+                           f"{image.get('unic_name', image['gfx_id'])}.{image.get('extension', 'jpg')}",
+                    'main': image.get('main', 0),
+                    'order': image.get('order', 1),
+                }, bulk=bulk)
+
+        if bulk.errors:
+            raise bulk.errors[0]
+        return {}
+
+    def _stage_details(self, row: dict, original: dict, entry: dict) -> dict:
+        result = self.products.update_product_by_code(
+            entry['product_id'],
+            attributes={config.OUTLET_ATTRIBUTE['group']: {config.OUTLET_ATTRIBUTE['id']: row['damage_type']}},
+            translations={'pl_PL': {'description': self.build_description(row, original)}},
+        )
+        if isinstance(result, dict):
+            raise RuntimeError(result.get('error'))
+        return {}
+
+    def _stage_redirect(self, row: dict, original: dict, entry: dict) -> dict:
+        redirect_id = self.redirects.create_redirect({'route': self.redirect_route(row),
+                                                      'target': config.REDIRECT_TARGET_OUTLET_URL})
+        return {'redirect_id': redirect_id}
+
+    def _process(self, row: dict, original: dict):
+        outlet_code = row['outlet_code']
+        for stage in self.STAGES:
+            # Other workers save the checkpoint at the same time, read a copy of this row's entry under the lock
+            with self.lock:
+                entry = copy.deepcopy(self.checkpoint.get(outlet_code, {'done': [], 'product_id': None}))
+            if stage in entry['done']:
+                continue
+            data = getattr(self, f'_stage_{stage}')(row, original, entry)
+            self._mark(outlet_code, stage, error=None, **data)
+
+    def run(self, rows: list[dict]) -> dict:
+        """List outlet rows, rows finished in a previous run are skipped.
+        Args:
+            rows (list): Outlet rows, see the class docstring
+        Returns:
+            dict: {'done': [outlet codes], 'failed': {outlet_code: error}, 'skipped': [already listed outlet codes]}
+        """
+        result = {'done': [], 'failed': {}, 'skipped': []}
+        pending = []
+
+        for row in rows:
+            if self.is_done(row['outlet_code']):
+                result['skipped'].append(row['outlet_code'])
+            elif row.get('damage_type') not in config.OUTLET_VALID_DAMAGE_TYPES:
+                result['failed'][row['outlet_code']] = f"Invalid damage type: {row.get('damage_type')}"
+            else:
+                pending.append(row)
+
+        if not pending:
+            return result
+
+        print(f"ℹ️  Listing {len(pending)} outlets ({len(result['skipped'])} already listed)...")
+
+        # Originals and their pictures are read once for all rows, the redirect index once per run
+        originals = self.products.get_products_by_codes([row['code'] for row in pending], pictures=True)
+        self.redirects.load_index()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {}
+            for row in pending:
+                original = originals['products'].get(str(row['code']))
+                if original is None:
+                    result['failed'][row['outlet_code']] = f"Product {row['code']} doesn't exist"
+                    continue
+                futures[executor.submit(self._process, row, original)] = row['outlet_code']
+
+            for future in tqdm(as_completed(futures), total=len(futures), desc='Listing outlets', unit=' outlet'):
+                outlet_code = futures[future]
+                try:
+                    future.result()
+                    result['done'].append(outlet_code)
+                except (ShoperAPIError, requests.RequestException, RuntimeError, KeyError) as e:
+                    self._mark(outlet_code, error=str(e))
+                    result['failed'][outlet_code] = str(e)
+
+        if result['failed']:
+            print(f"❌ {len(result['failed'])} outlets failed, run again to retry them")
+
+        return result
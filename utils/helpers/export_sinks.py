@@ -0,0 +1,120 @@
+import gzip
+import json
+import os
+import threading
+import config
+from pathlib import Path
+
+COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+def _open_compressed(path: Path, mode: str, compression: str | None):
+    """Open a (compressed) text file. zstd needs the optional zstandard package."""
+    if compression is None:
+        return open(path, mode, encoding='utf-8')
+
+    if compression == 'gzip':
+        return gzip.open(path, mode, encoding='utf-8', compresslevel=6)
+
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError('zstd compression requires the zstandard package (pip install zstandard)') from e
+        return zstandard.open(path, mode, encoding='utf-8')
+
+    raise ValueError(f'Unknown compression: {compression}, use one of {list(COMPRESSION_SUFFIXES)}')
+
+
+class NDJSONExportSink:
+    def __init__(self, filename: str, compression: str | None = config.EXPORT_COMPRESSION):
+        """Streaming export of records as newline-delimited JSON (Saved to exports directory).
+        Records are written one by one, so an export never holds the whole dataset in memory.
+        The data goes to a temporary file that is renamed over the target only when the sink
+        is closed successfully, so readers never see a half-written export.
+        Usage:
+            with NDJSONExportSink('shoper/shoper_products.ndjson') as sink:
+                sink.write_many(products.iter_products())
+        Args:
+            filename (str): File name relative to the exports directory, the compression suffix is appended
+            compression (str): None, 'gzip' or 'zstd'
+        """
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f'Unknown compression: {compression}, use one of {list(COMPRESSION_SUFFIXES)}')
+
+        self.compression = compression
+        self.filepath = config.EXPORTS_DIR / Path(f'{filename}{COMPRESSION_SUFFIXES[compression]}')
+        # Unique per process and thread, so concurrent exports of the same file never share a temporary file
+        self.temp_filepath = self.filepath.with_name(
+            f'.{self.filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        self.count = 0
+        self.file = None
+
+    def open(self):
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self.file = _open_compressed(self.temp_filepath, 'wt', self.compression)
+        return self
+
+    def write(self, record):
+        if self.file is None:
+            self.open()
+        self.file.write(json.dumps(record, ensure_ascii=False))
+        self.file.write('\n')
+        self.count += 1
+
+    def write_many(self, records) -> int:
+        """Write every record of an iterable or generator.
+        Returns:
+            int: Number of records written by this call
+        """
+        start = self.count
+        for record in records:
+            self.write(record)
+        return self.count - start
+
+    def close(self) -> Path:
+        """Finish the export and atomically move it into place.
+        Returns:
+            Path: Path of the exported file
+        """
+        if self.file is None:
+            self.open()
+        self.file.close()
+        self.file = None
+        os.replace(self.temp_filepath, self.filepath)
+        return self.filepath
+
+    def abort(self):
+        """Drop a partial export, the previous file (if any) stays untouched."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.temp_filepath.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def iter_ndjson(filepath: str | Path):
+    """Stream records back from an NDJSON export, compression is picked from the file suffix.
+    Args:
+        filepath (str|Path): Path of the file, relative paths are resolved against the exports directory
+    Yields:
+        dict: Records in file order
+    """
+    filepath = Path(filepath)
+    if not filepath.is_absolute():
+        filepath = config.EXPORTS_DIR / filepath
+
+    compression = {'.gz': 'gzip', '.zst': 'zstd'}.get(filepath.suffix)
+
+    with _open_compressed(filepath, 'rt', compression) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
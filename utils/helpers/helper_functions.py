@@ -2,6 +2,7 @@ import json
 import pandas as pd
 import config
 from pathlib import Path
+from .export_sinks import NDJSONExportSink
 
 # Pandas Selection and Filtering
 
@@ -33,4 +34,18 @@ def export_to_json(data: dict | list, filename: str) -> None:
     filepath.parent.mkdir(parents=True, exist_ok=True)
 
     with open(filepath, 'w', encoding='utf-8') as file:
-        json.dump(data, file, indent=4, ensure_ascii=False)
\ No newline at end of file
+        json.dump(data, file, indent=4, ensure_ascii=False)
+
+def export_to_ndjson(records, filename: str, compression: str | None = config.EXPORT_COMPRESSION) -> Path:
+    """Stream records to an NDJSON file (Saved to exports directory).
+    Args:
+        records (iterable): Records to export, a generator is consumed lazily.
+        filename (str): The name of the file to export to, the compression suffix is appended.
+        compression (str): None, 'gzip' or 'zstd'.
+    Returns:
+        Path: Path of the exported file
+    """
+    with NDJSONExportSink(filename, compression) as sink:
+        sink.write_many(records)
+
+    return sink.filepath
@@ -0,0 +1,194 @@
+import json
+import re
+import threading
+import time
+import config
+from datetime import datetime
+from urllib.parse import urlparse
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float('inf'))
+ID_SEGMENT = re.compile(r'^\d+$|^(?=.*\d)[\w-]{8,}$')
+
+
+def endpoint_template(url: str) -> str:
+    """'https://shop.pl/webapi/rest/products/123?page=2' -> '/webapi/rest/products/{id}'"""
+    path = urlparse(url).path if '://' in url else url
+    return '/'.join('{id}' if ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+class RequestMetrics:
+    def __init__(self):
+        """Per platform and endpoint request statistics, shared by every API client in the process.
+        Tracks request count per status code, a latency histogram, received bytes,
+        retries, 429 responses and time spent sleeping on rate limits and backoff.
+        """
+        self.lock = threading.Lock()
+        self.started_at = datetime.now()
+        self.endpoints = {}
+
+    def _endpoint(self, platform: str, method: str, url: str) -> dict:
+        key = (platform, method.upper(), endpoint_template(url))
+        if key not in self.endpoints:
+            self.endpoints[key] = {
+                'requests': 0,
+                'statuses': {},
+                'latency_buckets': [0] * len(LATENCY_BUCKETS),
+                'latency_sum': 0.0,
+                'latency_max': 0.0,
+                'bytes': 0,
+                'retries': 0,
+                'throttled': 0,
+                'sleep': 0.0,
+            }
+        return self.endpoints[key]
+
+    def record(self, platform: str, method: str, url: str, status: int | str, latency: float, size: int = 0):
+        """Record one HTTP request (a single attempt, retries are recorded separately)."""
+        with self.lock:
+            stats = self._endpoint(platform, method, url)
+            stats['requests'] += 1
+            stats['statuses'][str(status)] = stats['statuses'].get(str(status), 0) + 1
+            stats['latency_sum'] += latency
+            stats['latency_max'] = max(stats['latency_max'], latency)
+            stats['bytes'] += size
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    stats['latency_buckets'][i] += 1
+                    break
+
+    def record_retry(self, platform: str, method: str, url: str, status: int | str, sleep: float = 0.0):
+        """Record a retried request, 429 responses are counted as throttled."""
+        with self.lock:
+            stats = self._endpoint(platform, method, url)
+            stats['retries'] += 1
+            stats['sleep'] += sleep
+            if str(status) == '429':
+                stats['throttled'] += 1
+
+    def record_sleep(self, platform: str, method: str, url: str, sleep: float):
+        """Record time spent waiting for a rate limiter before a request."""
+        if sleep <= 0:
+            return
+        with self.lock:
+            self._endpoint(platform, method, url)['sleep'] += sleep
+
+    def response_hook(self, platform: str):
+        """requests session hook recording every response, for clients calling session.request directly:
+            session.hooks['response'].append(request_metrics.response_hook('allegro'))
+        """
+        def hook(response, *args, **kwargs):
+            self.record(platform, response.request.method, response.url, response.status_code,
+                        response.elapsed.total_seconds(), len(response.content or b''))
+        return hook
+
+    def timed(self, platform: str, method: str, endpoint: str, func, *args, **kwargs):
+        """Call func and record its duration, for SDK calls without a response object (e.g. gspread)."""
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            result = func(*args, **kwargs)
+            status = 'ok'
+            return result
+        finally:
+            self.record(platform, method, endpoint, status, time.perf_counter() - start)
+
+    def summary(self) -> dict:
+        """Statistics of every endpoint, sorted by total time spent."""
+        with self.lock:
+            endpoints = []
+            for (platform, method, template), stats in self.endpoints.items():
+                count = stats['requests']
+                endpoints.append({
+                    'platform': platform,
+                    'method': method,
+                    'endpoint': template,
+                    **stats,
+                    'latency_buckets': dict(zip([str(bound) for bound in LATENCY_BUCKETS], stats['latency_buckets'])),
+                    'latency_avg': stats['latency_sum'] / count if count else 0.0,
+                    'latency_p50': self._quantile(stats, 0.5),
+                    'latency_p99': self._quantile(stats, 0.99),
+                })
+
+        endpoints.sort(key=lambda endpoint: endpoint['latency_sum'] + endpoint['sleep'], reverse=True)
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'endpoints': endpoints,
+        }
+
+    @staticmethod
+    def _quantile(stats: dict, q: float) -> float | None:
+        """Upper bound of the histogram bucket holding the q-quantile."""
+        target = q * stats['requests']
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, stats['latency_buckets']):
+            seen += count
+            if count and seen >= target:
+                return bound if bound != float('inf') else stats['latency_max']
+        return None
+
+    def to_prometheus(self) -> str:
+        """Statistics in the Prometheus text exposition format."""
+        lines = []
+        metrics = {
+            'api_requests_total': ('counter', []),
+            'api_request_duration_seconds': ('histogram', []),
+            'api_response_bytes_total': ('counter', []),
+            'api_retries_total': ('counter', []),
+            'api_throttled_total': ('counter', []),
+            'api_sleep_seconds_total': ('counter', []),
+        }
+
+        with self.lock:
+            for (platform, method, template), stats in sorted(self.endpoints.items()):
+                labels = f'platform="{platform}",method="{method}",endpoint="{template}"'
+                for status, count in sorted(stats['statuses'].items()):
+                    metrics['api_requests_total'][1].append(f'api_requests_total{{{labels},status="{status}"}} {count}')
+
+                histogram = metrics['api_request_duration_seconds'][1]
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats['latency_buckets']):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else bound
+                    histogram.append(f'api_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                histogram.append(f'api_request_duration_seconds_sum{{{labels}}} {stats["latency_sum"]:.6f}')
+                histogram.append(f'api_request_duration_seconds_count{{{labels}}} {stats["requests"]}')
+
+                metrics['api_response_bytes_total'][1].append(f'api_response_bytes_total{{{labels}}} {stats["bytes"]}')
+                metrics['api_retries_total'][1].append(f'api_retries_total{{{labels}}} {stats["retries"]}')
+                metrics['api_throttled_total'][1].append(f'api_throttled_total{{{labels}}} {stats["throttled"]}')
+                metrics['api_sleep_seconds_total'][1].append(f'api_sleep_seconds_total{{{labels}}} {stats["sleep"]:.6f}')
+
+        for name, (metric_type, samples) in metrics.items():
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.extend(samples)
+
+        return '\n'.join(lines) + '\n'
+
+    def export(self, name: str = 'request_metrics') -> dict | None:
+        """Save the JSON summary and the Prometheus text to the logging directory.
+        Returns:
+            dict: Paths of the written files, None if nothing was recorded
+        """
+        if not self.endpoints:
+            return None
+
+        config.LOGGING_DIR.mkdir(parents=True, exist_ok=True)
+        timestamp = self.started_at.strftime('%Y-%m-%d_%H-%M-%S')
+        json_path = config.LOGGING_DIR / f'{name}_{timestamp}.json'
+        prometheus_path = config.LOGGING_DIR / f'{name}_{timestamp}.prom'
+
+        with open(json_path, 'w', encoding='utf-8') as file:
+            json.dump(self.summary(), file, indent=4, ensure_ascii=False)
+        with open(prometheus_path, 'w', encoding='utf-8') as file:
+            file.write(self.to_prometheus())
+
+        return {'json': json_path, 'prometheus': prometheus_path}
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+            self.started_at = datetime.now()
+
+
+request_metrics = RequestMetrics()
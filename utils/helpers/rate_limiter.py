@@ -0,0 +1,49 @@
+import threading
+import time
+
+
+class TokenBucketRateLimiter:
+    def __init__(self, rate: float, capacity: int, headroom: int = 0):
+        """Thread-safe token bucket shared by every thread sending requests through one client.
+        Tokens refill at `rate` per second up to `capacity - headroom`.
+        Args:
+            rate (float): Requests per second
+            capacity (int): Bucket size, the largest burst sent without waiting
+            headroom (int): Tokens kept free, so a server-side bucket of the same size never overflows
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.headroom = headroom
+        self.tokens = float(capacity - headroom)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity - self.headroom, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """Take a token without blocking. Used by the asyncio client to sleep without a thread.
+        Returns:
+            float: Seconds the caller has to wait before sending the request
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+    def acquire(self) -> float:
+        """Block until a request may be sent.
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, retry_after: float):
+        """Hold back every thread for `retry_after` seconds after a 429 response."""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, -retry_after * self.rate)
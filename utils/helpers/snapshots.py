@@ -0,0 +1,230 @@
+import config
+import contextlib
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+# Columnar snapshots of catalog exports. Every kind has a fixed, typed schema and a
+# function that flattens one API record into a row of that schema.
+
+
+def _get(record: dict, path: str):
+    """Read a nested value, e.g. _get(offer, 'sellingMode.price.amount')"""
+    value = record
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _int(value):
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _float(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _str(value):
+    return str(value) if value not in (None, '') else None
+
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'tak'}
+FALSE_VALUES = {'0', 'false', 'f', 'no', 'n', 'nie'}
+
+
+def _bool(value):
+    """1, '1', 'true', 'yes' -> True, 0, '0', 'false', 'no' -> False, anything else -> None"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    value = str(value).strip().lower() if value is not None else ''
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return None
+
+
+def _datetime(value):
+    """Shoper dates look like '2025-06-01 10:00:00', Allegro ones are ISO 8601."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+SNAPSHOT_SCHEMAS = {
+    'shoper_products': (
+        pa.schema([
+            ('product_id', pa.int64()),
+            ('code', pa.string()),
+            ('ean', pa.string()),
+            ('name', pa.string()),
+            ('category_id', pa.int64()),
+            ('producer_id', pa.int64()),
+            ('price', pa.float64()),
+            ('stock', pa.float64()),
+            ('active', pa.bool_()),
+            ('promo_id', pa.int64()),
+            ('add_date', pa.timestamp('s')),
+            ('edit_date', pa.timestamp('s')),
+        ]),
+        lambda product: {
+            'product_id': _int(product.get('product_id')),
+            'code': _str(product.get('code') or _get(product, 'stock.code')),
+            'ean': _str(product.get('ean') or _get(product, 'stock.ean')),
+            'name': _str(_get(product, 'translations.pl_PL.name')),
+            'category_id': _int(product.get('category_id')),
+            'producer_id': _int(product.get('producer_id')),
+            'price': _float(_get(product, 'stock.price')),
+            'stock': _float(_get(product, 'stock.stock')),
+            'active': _bool(_get(product, 'translations.pl_PL.active')),
+            'promo_id': _int(_get(product, 'special_offer.promo_id')),
+            'add_date': _datetime(product.get('add_date')),
+            'edit_date': _datetime(product.get('edit_date')),
+        }
+    ),
+    'shoper_special_offers': (
+        pa.schema([
+            ('promo_id', pa.int64()),
+            ('product_id', pa.int64()),
+            ('discount', pa.float64()),
+            ('discount_type', pa.int64()),
+            ('date_from', pa.timestamp('s')),
+            ('date_to', pa.timestamp('s')),
+        ]),
+        lambda offer: {
+            'promo_id': _int(offer.get('promo_id')),
+            'product_id': _int(offer.get('product_id')),
+            'discount': _float(offer.get('discount')),
+            'discount_type': _int(offer.get('discount_type')),
+            'date_from': _datetime(offer.get('date_from')),
+            'date_to': _datetime(offer.get('date_to')),
+        }
+    ),
+    'shoper_redirects': (
+        pa.schema([
+            ('redirect_id', pa.int64()),
+            ('type', pa.int64()),
+            ('route', pa.string()),
+            ('target', pa.string()),
+            ('object_id', pa.int64()),
+            ('lang_id', pa.int64()),
+        ]),
+        lambda redirect: {
+            'redirect_id': _int(redirect.get('redirect_id')),
+            'type': _int(redirect.get('type')),
+            'route': _str(redirect.get('route')),
+            'target': _str(redirect.get('target')),
+            'object_id': _int(redirect.get('object_id')),
+            'lang_id': _int(redirect.get('lang_id')),
+        }
+    ),
+    'allegro_offers': (
+        pa.schema([
+            ('id', pa.string()),
+            ('name', pa.string()),
+            ('external_id', pa.string()),
+            ('category_id', pa.string()),
+            ('price', pa.float64()),
+            ('currency', pa.string()),
+            ('stock_available', pa.int64()),
+            ('stock_sold', pa.int64()),
+            ('publication_status', pa.string()),
+            ('publication_started_at', pa.timestamp('s')),
+        ]),
+        lambda offer: {
+            'id': _str(offer.get('id')),
+            'name': _str(offer.get('name')),
+            'external_id': _str(_get(offer, 'external.id')),
+            'category_id': _str(_get(offer, 'category.id')),
+            'price': _float(_get(offer, 'sellingMode.price.amount')),
+            'currency': _str(_get(offer, 'sellingMode.price.currency')),
+            'stock_available': _int(_get(offer, 'stock.available')),
+            'stock_sold': _int(_get(offer, 'stock.sold')),
+            'publication_status': _str(_get(offer, 'publication.status')),
+            'publication_started_at': _datetime(_get(offer, 'publication.startedAt')),
+        }
+    ),
+}
+
+SNAPSHOT_FORMATS = {'parquet': '.parquet', 'feather': '.feather'}
+
+
+def snapshot_path(kind: str, file_format: str = 'parquet') -> Path:
+    return config.EXPORTS_DIR / 'snapshots' / f'{kind}{SNAPSHOT_FORMATS[file_format]}'
+
+
+def export_snapshot(records, kind: str, file_format: str = 'parquet', batch_size: int = 10_000) -> Path:
+    """Write records to a columnar snapshot with the fixed schema of `kind`.
+    Records are converted in batches, so a generator (e.g. ShoperProducts.iter_products())
+    is exported without holding every record in memory.
+    Args:
+        records (iterable): API records, e.g. products or Allegro offers
+        kind (str): One of SNAPSHOT_SCHEMAS
+        file_format (str): 'parquet' or 'feather'
+        batch_size (int): Records converted at once
+    Returns:
+        Path: Path of the snapshot
+    """
+    schema, to_row = SNAPSHOT_SCHEMAS[kind]
+    filepath = snapshot_path(kind, file_format)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    temp_filepath = filepath.with_name(f'.{filepath.name}.tmp')
+
+    sink = pa.OSFile(str(temp_filepath), 'wb')
+    if file_format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+
+    records = iter(records)
+    try:
+        while batch := list(islice(records, batch_size)):
+            writer.write_batch(pa.RecordBatch.from_pylist([to_row(record) for record in batch], schema=schema))
+        writer.close()
+    except BaseException:
+        # Close the writer before its sink, the partial file is removed either way
+        with contextlib.suppress(Exception):
+            writer.close()
+        sink.close()
+        temp_filepath.unlink(missing_ok=True)
+        raise
+    sink.close()
+
+    temp_filepath.replace(filepath)
+    return filepath
+
+
+def load_snapshot(kind: str, columns: list[str] | None = None, file_format: str = 'parquet') -> pd.DataFrame:
+    """Load a snapshot as a pandas DataFrame.
+    Args:
+        kind (str): One of SNAPSHOT_SCHEMAS
+        columns (list): Only read these columns, None for all of them
+        file_format (str): 'parquet' or 'feather'
+    Returns:
+        pd.DataFrame: Snapshot data
+    """
+    filepath = snapshot_path(kind, file_format)
+
+    if file_format == 'parquet':
+        table = pq.read_table(filepath, columns=columns)
+    else:
+        table = feather.read_table(filepath, columns=columns, memory_map=True)
+
+    return table.to_pandas()